@@ -1,6 +1,16 @@
+from datetime import datetime
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Product, Order, OrderItem
+from .lifecycle import transition
+from .models import ArchivedOrder, ArchivedOrderItem, Product, Order, OrderItem, PickupSlot
+from .paginators import LargeTablePaginator
+from .reports import invalidate_sales_report
 
 # Register your models here.
 
@@ -22,19 +32,227 @@ class ProductAdmin(admin.ModelAdmin):
 	image_thumb.short_description = "Image"
 
 
+def search_orders(model_admin, request, queryset, search_term):
+	"""Search orders by number ("123" or "#123") or exact customer username."""
+	term = search_term.strip().lstrip("#")
+	if term.isdigit():
+		return queryset.filter(pk=int(term)), False
+	return admin.ModelAdmin.get_search_results(model_admin, request, queryset, search_term)
+
+
+class DateHierarchyQuerySet(models.QuerySet):
+	"""Queryset whose year/month ``datetimes()`` come from MIN/MAX only.
+
+	The admin ``date_hierarchy`` lists the years (or months) that contain rows
+	with ``SELECT DISTINCT trunc(...)``, which reads the whole table. On an
+	indexed column MIN and MAX are two index lookups, so years and months are
+	listed from the range instead; empty months in a busy shop are rare.
+	"""
+
+	def datetimes(self, field_name, kind, order="ASC", tzinfo=None):
+		if kind not in ("year", "month"):
+			return super().datetimes(field_name, kind, order, tzinfo)
+		bounds = self.aggregate(first=models.Min(field_name), last=models.Max(field_name))
+		if bounds["first"] is None:
+			return []
+		first = timezone.localtime(bounds["first"], tzinfo)
+		last = timezone.localtime(bounds["last"], tzinfo)
+		if kind == "year":
+			values = [datetime(year, 1, 1) for year in range(first.year, last.year + 1)]
+		else:
+			values = [
+				datetime(month // 12, month % 12 + 1, 1)
+				for month in range(first.year * 12 + first.month - 1, last.year * 12 + last.month)
+			]
+		values = [timezone.make_aware(value, first.tzinfo) for value in values]
+		return values if order == "ASC" else values[::-1]
+
+
+KEYSET_PARAMS = ("id__lt", "id__lte")
+
+
+class KeysetChangeList(ChangeList):
+	"""ChangeList that applies the ``id__lt`` / ``id__lte`` bounds itself.
+
+	The bounds are kept out of the lookup parameters and applied last, so
+	``unbounded_queryset`` (filters and search, no bound) is left for working
+	out where the newer page starts.
+	"""
+
+	def get_filters_params(self, params=None):
+		lookup_params = super().get_filters_params(params)
+		for name in KEYSET_PARAMS:
+			lookup_params.pop(name, None)
+		return lookup_params
+
+	def get_queryset(self, request, exclude_parameters=None):
+		queryset = super().get_queryset(request, exclude_parameters)
+		self.unbounded_queryset = queryset
+		bounds = {name: self.params[name] for name in KEYSET_PARAMS if name in self.params}
+		try:
+			return queryset.filter(**bounds)
+		except (ValueError, ValidationError) as exc:
+			raise IncorrectLookupParameters(exc)
+
+
+class KeysetNavigationMixin:
+	"""Newer/older links that page an ``-id`` changelist by primary key.
+
+	LargeTablePaginator's page numbers stop at ``count_cap`` rows. These links
+	bound the changelist with ``id__lt`` / ``id__lte`` (filters and search
+	still apply) and always show the first page of the result, so any row can
+	be reached and each step costs a range scan on the primary key however
+	deep it goes.
+	"""
+
+	change_list_template = "admin/keyset_change_list.html"
+
+	def get_changelist(self, request, **kwargs):
+		return KeysetChangeList
+
+	def changelist_view(self, request, extra_context=None):
+		response = super().changelist_view(request, extra_context)
+		context = getattr(response, "context_data", None)
+		if context and "cl" in context and ORDER_VAR not in request.GET and self.get_ordering(request)[:1] == ("-id",):
+			context["keyset"] = self._keyset_links(request, context["cl"])
+		return response
+
+	def _keyset_links(self, request, cl):
+		rows = list(cl.result_list)
+		if not rows:
+			return None
+		remove = [PAGE_VAR, *KEYSET_PARAMS]
+		count_cap = getattr(cl.paginator, "count_cap", None)
+		links = {
+			"count_cap": count_cap,
+			"capped": count_cap is not None and cl.paginator.count >= count_cap,
+			"newer": None,
+			"older": None,
+		}
+		# A short page is the last one; the first unbounded page has nothing newer.
+		if len(rows) == cl.list_per_page and cl.queryset.filter(pk__lt=rows[-1].pk).exists():
+			links["older"] = cl.get_query_string({"id__lt": rows[-1].pk}, remove)
+		if not any(param in request.GET for param in remove):
+			return links
+		# The page of newer rows ends list_per_page rows above this page's first one.
+		newer = list(
+			cl.unbounded_queryset.filter(pk__gt=rows[0].pk)
+			.order_by("pk")
+			.values_list("pk", flat=True)[: cl.list_per_page]
+		)
+		if len(newer) == cl.list_per_page:
+			links["newer"] = cl.get_query_string({"id__lte": newer[-1]}, remove)
+		elif newer:
+			links["newer"] = cl.get_query_string(remove=remove)
+		return links
+
+
 class OrderItemInline(admin.TabularInline):
 	model = OrderItem
 	extra = 0
+	# A raw id input instead of a <select> listing every product per line.
+	raw_id_fields = ("product",)
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(KeysetNavigationMixin, admin.ModelAdmin):
 	list_display = ("id", "customer", "status", "total_amount", "created_at")
-	list_filter = ("status", "created_at")
-	search_fields = ("customer__username", "id")
+	list_filter = ("status",)
+	list_select_related = ("customer",)
+	date_hierarchy = "created_at"
+	ordering = ("-id",)
+	# Exact matches use the unique username index and the primary key
+	# instead of a join with LIKE '%...%'.
+	search_fields = ("customer__username__exact",)
+	search_help_text = "Exact customer username or order number."
+	autocomplete_fields = ("customer",)
+	paginator = LargeTablePaginator
+	show_full_result_count = False
 	inlines = [OrderItemInline]
+	actions = ["mark_preparing", "mark_ready_for_pickup", "mark_completed", "mark_cancelled"]
+
+	def get_queryset(self, request):
+		queryset = super().get_queryset(request)
+		return DateHierarchyQuerySet(self.model, query=queryset.query, using=queryset._db)
+
+	def get_search_results(self, request, queryset, search_term):
+		return search_orders(self, request, queryset, search_term)
+
+	def save_model(self, request, obj, form, change):
+		new_status = obj.status
+		if change and "status" in form.changed_data:
+			# Save the other edits first, then record the status change.
+			obj.status = form.initial["status"]
+			super().save_model(request, obj, form, change)
+			self._transition(request, [obj], new_status)
+		else:
+			super().save_model(request, obj, form, change)
+
+	def _transition(self, request, orders, new_status):
+		was_completed = any(order.status == Order.STATUS_COMPLETED for order in orders)
+		changed = transition(orders, new_status, changed_by=request.user)
+		if changed and (was_completed or new_status == Order.STATUS_COMPLETED):
+			invalidate_sales_report()
+		return changed
+
+	def _mark(self, request, queryset, new_status):
+		orders = queryset.select_related(None).only("status", "pickup_at", *Order.STATUS_TIMESTAMP_FIELDS.values())
+		changed = self._transition(request, list(orders), new_status)
+		self.message_user(request, f"Updated {changed} order(s).")
+
+	@admin.action(description="Mark selected orders as preparing")
+	def mark_preparing(self, request, queryset):
+		self._mark(request, queryset, Order.STATUS_PREPARING)
+
+	@admin.action(description="Mark selected orders as ready for pick up")
+	def mark_ready_for_pickup(self, request, queryset):
+		self._mark(request, queryset, Order.STATUS_READY_FOR_PICKUP)
+
+	@admin.action(description="Mark selected orders as completed")
+	def mark_completed(self, request, queryset):
+		self._mark(request, queryset, Order.STATUS_COMPLETED)
+
+	@admin.action(description="Mark selected orders as cancelled")
+	def mark_cancelled(self, request, queryset):
+		self._mark(request, queryset, Order.STATUS_CANCELLED)
+
+
+@admin.register(PickupSlot)
+class PickupSlotAdmin(admin.ModelAdmin):
+	list_display = ("starts_at", "category", "booked", "capacity")
+	list_filter = ("category",)
+	ordering = ("-starts_at",)
+	date_hierarchy = "starts_at"
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(KeysetNavigationMixin, admin.ModelAdmin):
 	list_display = ("order", "product", "quantity", "unit_price")
+	list_select_related = ("order__customer", "product")
+	ordering = ("-id",)
+	raw_id_fields = ("order", "product")
+	paginator = LargeTablePaginator
+	show_full_result_count = False
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+	model = ArchivedOrderItem
+	extra = 0
+	raw_id_fields = ("product",)
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(KeysetNavigationMixin, admin.ModelAdmin):
+	list_display = ("id", "customer", "status", "total_amount", "created_at", "archived_at")
+	list_filter = ("status",)
+	list_select_related = ("customer",)
+	ordering = ("-id",)
+	search_fields = ("customer__username__exact",)
+	search_help_text = "Exact customer username or order number."
+	raw_id_fields = ("customer",)
+	paginator = LargeTablePaginator
+	show_full_result_count = False
+	inlines = [ArchivedOrderItemInline]
+
+	def get_search_results(self, request, queryset, search_term):
+		return search_orders(self, request, queryset, search_term)
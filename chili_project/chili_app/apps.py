@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ChiliAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chili_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,32 @@
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_TIMEOUT = 60 * 15
+
+
+def user_cache_key(user_id) -> str:
+	return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id) -> None:
+	cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+	"""ModelBackend whose per-request ``get_user`` is served from the cache.
+
+	Entries are dropped whenever the user is saved or deleted (see
+	``chili_app.signals``), e.g. after ``ProfileForm`` saves or on login
+	when ``last_login`` changes.
+	"""
+
+	def get_user(self, user_id):
+		key = user_cache_key(user_id)
+		user = cache.get(key)
+		if user is None:
+			user = super().get_user(user_id)
+			if user is not None:
+				cache.set(key, user, USER_CACHE_TIMEOUT)
+		elif not self.user_can_authenticate(user):
+			return None
+		return user
@@ -0,0 +1,44 @@
+"""Jinja2 environment for the optional Jinja2 template backend.
+
+Enabled with DJANGO_JINJA2_TEMPLATES=true (see settings.py). Only the hot
+list pages have Jinja2 ports under ``jinja2_templates/``; every other template
+name falls through to the Django engine. The ports share their styles and
+scripts with the Django templates through ``templates/partials/``.
+"""
+
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, PrefixLoader
+
+
+def url(name, *args, **kwargs):
+	return reverse(name, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg=None, tz=None):
+	"""Django's ``date`` filter, in the current time zone like the Django engine renders it.
+
+	``tz`` (a zone name) renders in that zone instead, like ``|timezone:tz|date``.
+	"""
+	if value is None:
+		return ""
+	if timezone.is_aware(value):
+		value = timezone.localtime(value, ZoneInfo(tz) if tz else None)
+	return defaultfilters.date(value, arg)
+
+
+def environment(**options):
+	env = Environment(**options)
+	env.loader = ChoiceLoader([
+		env.loader,
+		PrefixLoader({"partials": FileSystemLoader(settings.BASE_DIR / "templates" / "partials")}),
+	])
+	env.globals.update({"static": static, "url": url, "get_messages": get_messages})
+	env.filters["date"] = date
+	return env
@@ -0,0 +1,125 @@
+"""Order status transitions and kitchen throughput metrics.
+
+Every status change goes through transition(), which stamps the per-status
+timestamp on Order and writes an OrderStatusEvent. The metrics read the
+events in a time window with one range query on their indexed
+``created_at``.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+
+from .models import ArchivedOrder, Order, OrderStatusEvent
+from .pickup import release_slots, shop_timezone
+
+ACTIVE_STATUSES = (Order.STATUS_PENDING, Order.STATUS_PREPARING, Order.STATUS_READY_FOR_PICKUP)
+
+
+def transition(orders, new_status, changed_by=None) -> int:
+	"""Move ``orders`` (Order instances) to ``new_status``.
+
+	All events are written with one bulk insert and all orders are updated
+	with one UPDATE. Orders already in ``new_status`` are skipped. Returns the
+	number of orders changed.
+	"""
+	now = timezone.now()
+	orders = [order for order in orders if order.status != new_status]
+	if not orders:
+		return 0
+
+	events = [
+		OrderStatusEvent(
+			order=order,
+			from_status=order.status,
+			to_status=new_status,
+			entered_at=order.status_entered_at(),
+			created_at=now,
+			changed_by=changed_by,
+		)
+		for order in orders
+	]
+	updates = {"status": new_status}
+	field = Order.STATUS_TIMESTAMP_FIELDS[new_status]
+	if field != "created_at":
+		updates[field] = now
+	if new_status == Order.STATUS_CANCELLED:
+		# The slot is handed back below; clearing it keeps a reopen-and-cancel from releasing twice
+		updates["pickup_at"] = None
+
+	with transaction.atomic():
+		OrderStatusEvent.objects.bulk_create(events)
+		Order.objects.filter(pk__in=[order.pk for order in orders]).update(**updates)
+		if new_status == Order.STATUS_CANCELLED:
+			release_slots(orders)
+	for order in orders:
+		for name, value in updates.items():
+			setattr(order, name, value)
+	return len(orders)
+
+
+def percentile(values, pct):
+	"""Nearest-rank percentile of a sorted list, or None when it is empty."""
+	if not values:
+		return None
+	rank = max(1, -(-len(values) * pct // 100))
+	return values[int(rank) - 1]
+
+
+def queue_depth():
+	counts = dict(
+		Order.objects.filter(status__in=ACTIVE_STATUSES)
+		.values_list("status")
+		.annotate(count=Count("id"))
+		.order_by()
+	)
+	labels = dict(Order.STATUS_CHOICES)
+	return [{"status": status, "label": labels[status], "count": counts.get(status, 0)} for status in ACTIVE_STATUSES]
+
+
+def throughput_by_hour(days: int = 14):
+	"""Orders placed and p50/p90 minutes spent in each active status, by hour of day.
+
+	Time in a status is bucketed by the hour the order entered it, so a rush
+	shows up in the hour that caused the wait. Hours are read on the shop's
+	clock (PICKUP_TIME_ZONE), not TIME_ZONE.
+	"""
+	since = timezone.now() - timedelta(days=days)
+	tz = shop_timezone()
+
+	minutes = defaultdict(list)
+	events = OrderStatusEvent.objects.filter(
+		created_at__gte=since,
+		from_status__in=ACTIVE_STATUSES,
+	).values_list("from_status", "entered_at", "created_at")
+	for status, entered_at, left_at in events.iterator():
+		minutes[(status, timezone.localtime(entered_at, tz).hour)].append((left_at - entered_at).total_seconds() / 60)
+
+	# Archived orders keep their timestamps, so windows older than the
+	# archive cutoff still count them.
+	placed = Counter()
+	for model in (Order, ArchivedOrder):
+		placed.update(
+			dict(
+				model.objects.filter(created_at__gte=since)
+				.annotate(hour=ExtractHour("created_at", tzinfo=tz))
+				.values_list("hour")
+				.annotate(count=Count("id"))
+				.order_by()
+			)
+		)
+
+	rows = []
+	for hour in range(24):
+		row = {"hour": hour, "placed": placed.get(hour, 0), "statuses": []}
+		for status in ACTIVE_STATUSES:
+			values = sorted(minutes.get((status, hour), []))
+			row["statuses"].append({"count": len(values), "p50": percentile(values, 50), "p90": percentile(values, 90)})
+		if row["placed"] or any(cell["count"] for cell in row["statuses"]):
+			row["placed_per_day"] = row["placed"] / days
+			rows.append(row)
+	return rows
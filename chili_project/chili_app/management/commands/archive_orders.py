@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from chili_app.models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+class Command(BaseCommand):
+	help = (
+		"Move completed and cancelled orders older than --days, together with "
+		"their items, into the archive tables in batched transactions. Status "
+		"history is left in place for the kitchen metrics."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--days",
+			type=int,
+			default=90,
+			help="Archive orders placed more than this many days ago (default: 90).",
+		)
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=500,
+			help="Number of orders moved per transaction (default: 500).",
+		)
+		parser.add_argument(
+			"--dry-run",
+			action="store_true",
+			help="Only report how many orders would be archived.",
+		)
+
+	def handle(self, *args, **options):
+		days = options["days"]
+		batch_size = options["batch_size"]
+		if days < 1:
+			raise CommandError("--days must be at least 1.")
+		if batch_size < 1:
+			raise CommandError("--batch-size must be at least 1.")
+
+		cutoff = timezone.now() - timedelta(days=days)
+		candidates = Order.objects.filter(
+			created_at__lt=cutoff,
+			status__in=[Order.STATUS_COMPLETED, Order.STATUS_CANCELLED],
+		)
+
+		if options["dry_run"]:
+			self.stdout.write(f"{candidates.count()} orders would be archived.")
+			return
+
+		orders_moved = 0
+		items_moved = 0
+		last_id = 0
+		while True:
+			# Walk the primary key so every batch is an index range scan and
+			# each transaction stays short enough not to block checkouts.
+			with transaction.atomic():
+				batch = list(
+					candidates.filter(pk__gt=last_id)
+					.order_by("pk")
+					.select_for_update()[:batch_size]
+				)
+				if not batch:
+					break
+				last_id = batch[-1].pk
+				order_ids = [order.pk for order in batch]
+				items = list(OrderItem.objects.filter(order_id__in=order_ids))
+
+				ArchivedOrder.objects.bulk_create(
+					[
+						ArchivedOrder(
+							id=order.pk,
+							customer_id=order.customer_id,
+							created_at=order.created_at,
+							status=order.status,
+							total_amount=order.total_amount,
+							preparing_at=order.preparing_at,
+							ready_at=order.ready_at,
+							completed_at=order.completed_at,
+							cancelled_at=order.cancelled_at,
+							pickup_at=order.pickup_at,
+							payment_method=order.payment_method,
+						)
+						for order in batch
+					]
+				)
+				ArchivedOrderItem.objects.bulk_create(
+					[
+						ArchivedOrderItem(
+							order_id=item.order_id,
+							product_id=item.product_id,
+							quantity=item.quantity,
+							unit_price=item.unit_price,
+							addons=item.addons,
+						)
+						for item in items
+					]
+				)
+				OrderItem.objects.filter(order_id__in=order_ids).delete()
+				# Status events stay in place (their FK has no DB constraint) and
+				# keep pointing at the same id, now an ArchivedOrder.
+				Order.objects.filter(pk__in=order_ids).delete()
+
+			orders_moved += len(batch)
+			items_moved += len(items)
+			self.stdout.write(f"Archived {orders_moved} orders so far...")
+
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Archived {orders_moved} orders and {items_moved} order items older than {days} days."
+			)
+		)
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.template import engines
+from django.test import RequestFactory
+
+from chili_app.models import Order, Product
+from chili_app.templating import HOT_TEMPLATES, time_render
+
+
+class Command(BaseCommand):
+	help = "Render the hot list templates with the Django and Jinja2 engines side by side."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--orders",
+			type=int,
+			default=200,
+			help="Orders listed on the order pages (default: 200).",
+		)
+		parser.add_argument(
+			"--iterations",
+			type=int,
+			default=20,
+			help="Renders timed per template and engine (default: 20).",
+		)
+
+	def handle(self, *args, **options):
+		if options["orders"] < 1 or options["iterations"] < 1:
+			raise CommandError("--orders and --iterations must be at least 1.")
+
+		staff = User.objects.filter(is_staff=True).first()
+		customer = (
+			User.objects.filter(is_staff=False)
+			.annotate(order_count=Count("orders"))
+			.order_by("-order_count")
+			.first()
+		)
+		if staff is None or customer is None:
+			raise CommandError("Needs a staff user and a customer; run seed_bench first.")
+
+		contexts = self.build_contexts(customer, options["orders"])
+		backends = [("django", engines["django"])]
+		try:
+			from django.template.backends.jinja2 import Jinja2
+
+			if "jinja2" in engines:
+				backends.append(("jinja2", engines["jinja2"]))
+			else:
+				params = {key: value for key, value in settings.JINJA2_TEMPLATE_ENGINE.items() if key != "BACKEND"}
+				backends.append(("jinja2", Jinja2(params)))
+		except ImportError:
+			self.stdout.write(self.style.WARNING("jinja2 is not installed; timing the Django engine only."))
+
+		factory = RequestFactory()
+		self.stdout.write(f"{'template':<22}" + "".join(f"{name:>12}" for name, _ in backends))
+		for name in HOT_TEMPLATES:
+			user = staff if name.startswith("admin_") else customer
+			timings = []
+			for _, backend in backends:
+				request = factory.get("/")
+				request.user = user
+				template = backend.get_template(name)
+				timings.append(time_render(template, contexts[name], request, options["iterations"]))
+			row = f"{name:<22}" + "".join(f"{ms:>10.2f}ms" for ms in timings)
+			if len(timings) == 2:
+				row += f"  ({timings[0] / timings[1]:.1f}x)"
+			self.stdout.write(row)
+
+	def build_contexts(self, customer, limit):
+		"""Mirror the contexts the views pass, with lists materialized once."""
+		orders = Order.objects.select_related("customer").order_by("-created_at").prefetch_related("items__product")
+		own = orders.filter(customer=customer)
+		active = [Order.STATUS_PENDING, Order.STATUS_PREPARING, Order.STATUS_READY_FOR_PICKUP]
+		return {
+			"order_now.html": {"products": list(Product.objects.filter(is_active=True).order_by("category", "name"))},
+			"my_orders.html": {
+				"active_orders": list(own.filter(status__in=active)[:limit]),
+				"past_orders": list(own.exclude(status__in=active)[:limit]),
+				"show_full_history": False,
+			},
+			"admin_orders.html": {"orders": list(orders[:limit])},
+		}
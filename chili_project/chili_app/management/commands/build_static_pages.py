@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+	help = "Pre-render the anonymous pages in PRERENDERED_PAGES for WhiteNoise to serve."
+
+	def handle(self, *args, **options):
+		out_dir = settings.PRERENDERED_DIR
+		out_dir.mkdir(parents=True, exist_ok=True)
+		factory = RequestFactory()
+		session_store = import_string(f"{settings.SESSION_ENGINE}.SessionStore")
+		built = 0
+
+		for name in settings.PRERENDERED_PAGES:
+			url = reverse(name)
+			request = factory.get(url)
+			request.user = AnonymousUser()
+			request.session = session_store()
+			request._messages = FallbackStorage(request)
+			response = resolve(url).func(request)
+			if response.status_code != 200:
+				raise CommandError(f"{url} returned {response.status_code}.")
+			# A page that issues a CSRF token or touches the session is per-visitor.
+			if "CSRF_COOKIE" in request.META or request.session.accessed:
+				self.stdout.write(self.style.WARNING(f"Skipped {url}: it needs a per-visitor session or CSRF token."))
+				continue
+
+			path = out_dir / url.lstrip("/") / "index.html"
+			path.parent.mkdir(parents=True, exist_ok=True)
+			path.write_bytes(response.content)
+			built += 1
+			self.stdout.write(f"Rendered {url} -> {path.relative_to(out_dir)}")
+
+		self.stdout.write(self.style.SUCCESS(f"Pre-rendered {built} page(s) into {out_dir}."))
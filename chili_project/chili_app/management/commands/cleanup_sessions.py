@@ -0,0 +1,178 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from chili_app.sessions import CART_KEYS, CART_UPDATED_AT
+
+
+class Command(BaseCommand):
+	help = (
+		"Delete expired sessions and clear abandoned carts in small batches, then "
+		"reclaim space and refresh planner statistics. Safe to run on a schedule."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=500,
+			help="Sessions deleted or rewritten per transaction (default: 500).",
+		)
+		parser.add_argument(
+			"--cart-days",
+			type=int,
+			default=settings.CART_ABANDONED_AFTER // 86400,
+			help="Clear carts untouched for this many days (default: CART_ABANDONED_AFTER).",
+		)
+		parser.add_argument(
+			"--pause",
+			type=float,
+			default=0.05,
+			help="Seconds to sleep between batches so checkouts can take the write lock (default: 0.05).",
+		)
+		parser.add_argument(
+			"--full-vacuum",
+			action="store_true",
+			help=(
+				"On SQLite, run a full VACUUM and switch the file to incremental auto-vacuum. "
+				"Needed once per database file; until then runs without it only ANALYZE."
+			),
+		)
+
+	def handle(self, *args, **options):
+		if options["batch_size"] < 1:
+			raise CommandError("--batch-size must be at least 1.")
+		if options["cart_days"] < 1:
+			raise CommandError("--cart-days must be at least 1.")
+
+		self.batch_size = options["batch_size"]
+		self.pause = options["pause"]
+		self.store_class = import_string(f"{settings.SESSION_ENGINE}.SessionStore")
+		now = timezone.now()
+
+		started = time.perf_counter()
+		expired = self.delete_expired_sessions(now)
+		self.report(f"Deleted {expired} expired sessions", started)
+
+		started = time.perf_counter()
+		cutoff = time.time() - options["cart_days"] * 86400
+		carts, stamped = self.clear_abandoned_carts(now, cutoff)
+		self.report(f"Cleared {carts} abandoned carts, dated {stamped} undated ones", started)
+
+		started = time.perf_counter()
+		summary = self.compact(options["full_vacuum"])
+		self.report(summary, started)
+
+	def report(self, message, started):
+		self.stdout.write(self.style.SUCCESS(f"{message} in {time.perf_counter() - started:.2f}s."))
+
+	def forget_cached(self, session_keys):
+		"""Drop the cached copies so the cleaned database rows are what gets read next.
+
+		This only reaches the web process when the cache is shared (not LocMemCache);
+		otherwise the session store drops stale carts itself when it loads them.
+		"""
+		store = self.store_class()
+		keys = []
+		for session_key in session_keys:
+			keys.append(f"{store.cache_key_prefix}{session_key}")
+			if hasattr(store, "_db_synced_key"):
+				keys.append(store._db_synced_key(session_key))
+		if keys and hasattr(store, "_cache"):
+			store._cache.delete_many(keys)
+
+	def delete_expired_sessions(self, now):
+		removed = 0
+		while True:
+			with transaction.atomic():
+				keys = list(
+					Session.objects.filter(expire_date__lt=now).values_list("pk", flat=True)[: self.batch_size]
+				)
+				if not keys:
+					break
+				removed += Session.objects.filter(pk__in=keys).delete()[0]
+			self.forget_cached(keys)
+			time.sleep(self.pause)
+		return removed
+
+	def clear_abandoned_carts(self, now, cutoff):
+		"""Clear carts stamped before ``cutoff``; returns (cleared, stamped).
+
+		Carts saved before CART_UPDATED_AT existed are stamped with the current
+		time, so they are cleared once they have sat for the full period.
+		"""
+		store = self.store_class()
+		cleared = stamped = 0
+		last_key = ""
+		while True:
+			# Keyset pagination over live sessions; session data can only be
+			# inspected after decoding, so each batch is read and rewritten.
+			rows = list(
+				Session.objects.filter(expire_date__gte=now, pk__gt=last_key)
+				.order_by("pk")
+				.values_list("pk", "session_data", "expire_date")[: self.batch_size]
+			)
+			if not rows:
+				break
+			last_key = rows[-1][0]
+
+			changed = []
+			for session_key, session_data, expire_date in rows:
+				data = store.decode(session_data)
+				if not data.get("cart"):
+					continue
+				if CART_UPDATED_AT not in data:
+					data[CART_UPDATED_AT] = int(time.time())
+					changed.append((session_key, session_data, expire_date, store.encode(data), False))
+				elif data[CART_UPDATED_AT] < cutoff:
+					for key in CART_KEYS:
+						data.pop(key, None)
+					changed.append((session_key, session_data, expire_date, store.encode(data), True))
+			if changed:
+				written = []
+				with transaction.atomic():
+					for session_key, session_data, expire_date, new_data, is_clear in changed:
+						# Only if the customer has not saved the session since it was read.
+						if Session.objects.filter(
+							pk=session_key, session_data=session_data, expire_date=expire_date
+						).update(session_data=new_data):
+							written.append(session_key)
+							cleared += is_clear
+							stamped += not is_clear
+				self.forget_cached(written)
+				time.sleep(self.pause)
+		return cleared, stamped
+
+	def compact(self, full_vacuum):
+		with connection.cursor() as cursor:
+			if connection.vendor == "sqlite":
+				cursor.execute("PRAGMA freelist_count")
+				free_before = cursor.fetchone()[0]
+				if full_vacuum:
+					# auto_vacuum only changes on VACUUM; later runs can then go incremental.
+					cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+					cursor.execute("VACUUM")
+				else:
+					cursor.execute("PRAGMA auto_vacuum")
+					if cursor.fetchone()[0] == 2:
+						cursor.execute("PRAGMA incremental_vacuum")
+					else:
+						self.stdout.write(
+							self.style.WARNING(
+								"Incremental auto-vacuum is off for this database; run once with "
+								"--full-vacuum to enable it. Free pages were not released."
+							)
+						)
+				cursor.execute("ANALYZE")
+				cursor.execute("PRAGMA freelist_count")
+				free_after = cursor.fetchone()[0]
+				return f"Free pages {free_before} -> {free_after}; statistics refreshed"
+			if connection.vendor == "postgresql":
+				cursor.execute(f"VACUUM (ANALYZE) {Session._meta.db_table}")
+				return f"Vacuumed and analyzed {Session._meta.db_table}"
+		return f"No vacuum step for {connection.vendor}"
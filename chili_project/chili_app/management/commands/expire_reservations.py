@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from chili_app.models import StockReservation
+
+
+class Command(BaseCommand):
+	help = "Delete expired stock reservations in small batches."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=1000,
+			help="Reservations deleted per transaction (default: 1000).",
+		)
+
+	def handle(self, *args, **options):
+		batch_size = options["batch_size"]
+		if batch_size < 1:
+			raise CommandError("--batch-size must be at least 1.")
+
+		started = time.perf_counter()
+		now = timezone.now()
+		removed = 0
+		while True:
+			with transaction.atomic():
+				ids = list(
+					StockReservation.objects.filter(expires_at__lte=now)
+					.order_by("expires_at")
+					.values_list("pk", flat=True)[:batch_size]
+				)
+				if not ids:
+					break
+				removed += StockReservation.objects.filter(pk__in=ids).delete()[0]
+
+		self.stdout.write(
+			self.style.SUCCESS(f"Removed {removed} expired reservations in {time.perf_counter() - started:.2f}s.")
+		)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from chili_app.media import HASHED_NAME
+from chili_app.models import Product
+
+
+class Command(BaseCommand):
+	help = "Give existing product images content-hashed names so they can be cached forever."
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--dry-run",
+			action="store_true",
+			help="List the images that would be renamed without changing anything.",
+		)
+
+	def handle(self, *args, **options):
+		renamed = 0
+		for product in Product.objects.exclude(image="").exclude(image__isnull=True).order_by("id"):
+			old_name = product.image.name
+			if HASHED_NAME.search(old_name):
+				continue
+			storage = product.image.storage
+			if not storage.exists(old_name):
+				self.stdout.write(self.style.WARNING(f"Missing file for product #{product.id}: {old_name}"))
+				continue
+			if options["dry_run"]:
+				self.stdout.write(f"Would rename {old_name}")
+				renamed += 1
+				continue
+
+			with storage.open(old_name) as fh:
+				new_name = storage.save(old_name, fh)
+			Product.objects.filter(pk=product.pk).update(image=new_name)
+			# Other products may share the same upload.
+			if not Product.objects.filter(image=old_name).exists():
+				storage.delete(old_name)
+			renamed += 1
+			self.stdout.write(f"{old_name} -> {new_name}")
+
+		verb = "Would rename" if options["dry_run"] else "Renamed"
+		self.stdout.write(self.style.SUCCESS(f"{verb} {renamed} image(s)."))
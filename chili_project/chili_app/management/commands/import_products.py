@@ -0,0 +1,46 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chili_app.product_import import import_products, parse_rows
+
+
+class Command(BaseCommand):
+	help = "Create and update products from a CSV or JSONL file in one transaction."
+
+	def add_arguments(self, parser):
+		parser.add_argument("path", help="CSV file, or .jsonl/.ndjson for JSON Lines.")
+		parser.add_argument(
+			"--dry-run",
+			action="store_true",
+			help="Validate and report the changes without saving them.",
+		)
+
+	def handle(self, *args, **options):
+		path = Path(options["path"])
+		try:
+			rows = parse_rows(path.read_bytes(), path.name)
+		except OSError as exc:
+			raise CommandError(f"Cannot read {path}: {exc}")
+		except ValueError as exc:
+			raise CommandError(str(exc))
+
+		summary, errors = import_products(rows, dry_run=options["dry_run"])
+		if errors:
+			for error in errors:
+				self.stderr.write(error)
+			raise CommandError("Nothing was imported.")
+
+		for product, fields in summary["updated"]:
+			changes = ", ".join(f"{field} {old} -> {new}" for field, old, new in fields)
+			self.stdout.write(f"#{product.id} {product.name}: {changes}")
+		for product in summary["created"]:
+			self.stdout.write(f"new: {product.name}")
+
+		verb = "Would import" if options["dry_run"] else "Imported"
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"{verb} {len(rows)} rows: {len(summary['created'])} created, "
+				f"{len(summary['updated'])} updated, {summary['unchanged']} unchanged."
+			)
+		)
@@ -0,0 +1,134 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from chili_app.models import ArchivedOrderItem, Order, OrderItem, Product, RestockRecommendation
+
+
+def _daily_units(model, since):
+	"""Units sold per (product, day), aggregated by the database."""
+	return (
+		model.objects.filter(order__created_at__gte=since)
+		.exclude(order__status=Order.STATUS_CANCELLED)
+		.annotate(day=TruncDate("order__created_at", output_field=DateField()))
+		.values_list("product_id", "day")
+		.annotate(units=Sum("quantity"))
+		.order_by()
+	)
+
+
+class Command(BaseCommand):
+	help = (
+		"Forecast demand per product from order history and store restock "
+		"recommendations and projected stock-out dates for the admin dashboard."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--history-days",
+			type=int,
+			default=56,
+			help="Days of order history to learn from (default: 56, i.e. 8 weeks).",
+		)
+		parser.add_argument(
+			"--cover-days",
+			type=int,
+			default=14,
+			help="Days of demand a restock should cover (default: 14).",
+		)
+		parser.add_argument(
+			"--horizon-days",
+			type=int,
+			default=60,
+			help="How far ahead to look for a stock-out (default: 60).",
+		)
+
+	def handle(self, *args, **options):
+		history_days = options["history_days"]
+		cover_days = options["cover_days"]
+		horizon_days = options["horizon_days"]
+		if history_days < 7:
+			raise CommandError("--history-days must be at least 7 to estimate weekday seasonality.")
+
+		now = timezone.now()
+		today = timezone.localdate()
+		first_day = today - timedelta(days=history_days)
+		since = timezone.make_aware(datetime.combine(first_day, time.min))
+
+		products = list(Product.objects.filter(is_active=True).only("id", "stock"))
+		column = {product.id: i for i, product in enumerate(products)}
+
+		# units[d][p]: one row per history day, one column per product.
+		units = [[0] * len(products) for _ in range(history_days)]
+		for model in (OrderItem, ArchivedOrderItem):
+			for product_id, day, quantity in _daily_units(model, since):
+				p = column.get(product_id)
+				d = (day - first_day).days
+				if p is not None and 0 <= d < history_days:
+					units[d][p] += quantity
+
+		# Column-wise reductions over the day x product matrix.
+		totals = [sum(col) for col in zip(*units)] if products else []
+		rates = [total / history_days for total in totals]
+
+		weekday_sums = [[0] * len(products) for _ in range(7)]
+		weekday_days = [0] * 7
+		for d, row in enumerate(units):
+			weekday = (first_day + timedelta(days=d)).weekday()
+			weekday_days[weekday] += 1
+			weekday_sums[weekday] = [a + b for a, b in zip(weekday_sums[weekday], row)]
+		# factors[w][p]: demand on weekday w relative to the product's average day.
+		factors = [
+			[
+				(weekday_sum / weekday_days[w]) / rate if rate else 1.0
+				for weekday_sum, rate in zip(weekday_sums[w], rates)
+			]
+			for w in range(7)
+		]
+
+		# forecast[h][p]: expected units sold h days from today.
+		forecast = [
+			[rate * factor for rate, factor in zip(rates, factors[(today + timedelta(days=h)).weekday()])]
+			for h in range(max(horizon_days, cover_days))
+		]
+
+		recommendations = []
+		for p, product in enumerate(products):
+			stock = product.stock or 0
+			remaining = stock
+			stockout = None
+			for h in range(horizon_days):
+				remaining -= forecast[h][p]
+				if remaining <= 0 and rates[p] > 0:
+					stockout = today + timedelta(days=h)
+					break
+			needed = sum(forecast[h][p] for h in range(cover_days))
+			recommendations.append(
+				RestockRecommendation(
+					product_id=product.id,
+					daily_demand=Decimal(str(round(rates[p], 2))),
+					weekday_factors=[round(factors[w][p], 3) for w in range(7)],
+					stock_at_computation=stock,
+					projected_stockout=stockout,
+					recommended_quantity=max(0, math.ceil(needed - stock)),
+					computed_at=now,
+				)
+			)
+
+		with transaction.atomic():
+			RestockRecommendation.objects.all().delete()
+			RestockRecommendation.objects.bulk_create(recommendations, batch_size=500)
+
+		at_risk = sum(1 for r in recommendations if r.projected_stockout is not None)
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Stored {len(recommendations)} recommendations; {at_risk} products projected to run out "
+				f"within {horizon_days} days."
+			)
+		)
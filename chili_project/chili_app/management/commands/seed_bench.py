@@ -0,0 +1,260 @@
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from chili_app.models import Order, OrderItem, OrderStatusEvent, Product
+from chili_app.pickup import shop_timezone
+
+# Relative order volume per hour of day on the shop's clock: lunch and dinner rushes.
+HOUR_WEIGHTS = [
+	0, 0, 0, 0, 0, 0, 1, 2, 3, 3, 5, 12,
+	16, 10, 4, 3, 4, 7, 12, 10, 6, 3, 1, 0,
+]
+
+# Status mix for orders that are no longer in progress.
+FINISHED_STATUSES = [Order.STATUS_COMPLETED] * 92 + [Order.STATUS_CANCELLED] * 8
+ACTIVE_STATUSES = [
+	Order.STATUS_PENDING,
+	Order.STATUS_PREPARING,
+	Order.STATUS_READY_FOR_PICKUP,
+]
+
+# Minutes an order typically spends in each status before moving on; busy
+# hours stretch the wait (see _timeline).
+STATUS_MINUTES = {
+	Order.STATUS_PENDING: (2, 15),
+	Order.STATUS_PREPARING: (8, 25),
+	Order.STATUS_READY_FOR_PICKUP: (5, 40),
+}
+PATHS = {
+	Order.STATUS_PENDING: [Order.STATUS_PENDING],
+	Order.STATUS_PREPARING: [Order.STATUS_PENDING, Order.STATUS_PREPARING],
+	Order.STATUS_READY_FOR_PICKUP: [Order.STATUS_PENDING, Order.STATUS_PREPARING, Order.STATUS_READY_FOR_PICKUP],
+	Order.STATUS_COMPLETED: [
+		Order.STATUS_PENDING,
+		Order.STATUS_PREPARING,
+		Order.STATUS_READY_FOR_PICKUP,
+		Order.STATUS_COMPLETED,
+	],
+	Order.STATUS_CANCELLED: [Order.STATUS_PENDING, Order.STATUS_CANCELLED],
+}
+
+ADDONS = ["", "", "", "Extra Chili Garlic oil (+₱15)", "Fries size: Large (+₱80) | Flavor: Cheese"]
+
+
+@contextmanager
+def _explicit_created_at(*models):
+	"""Let bulk_create keep our generated timestamps instead of auto_now_add."""
+	fields = [model._meta.get_field("created_at") for model in models]
+	for field in fields:
+		field.auto_now_add = False
+	try:
+		yield
+	finally:
+		for field in fields:
+			field.auto_now_add = True
+
+
+def _timeline(rng, status, created_at, hour, now):
+	"""Status timestamps and (from, to, entered_at, left_at) events for an order reaching ``status``."""
+	rush = 1 + HOUR_WEIGHTS[hour] / 8
+	timestamps = {}
+	events = []
+	entered_at = created_at
+	path = PATHS[status]
+	for previous, current in zip(path, path[1:]):
+		low, high = STATUS_MINUTES[previous]
+		left_at = min(entered_at + timedelta(minutes=rng.uniform(low, high) * rush), now)
+		timestamps[Order.STATUS_TIMESTAMP_FIELDS[current]] = left_at
+		events.append((previous, current, entered_at, left_at))
+		entered_at = left_at
+	return timestamps, events
+
+
+class Command(BaseCommand):
+	help = (
+		"Generate a deterministic synthetic dataset (products, customers, orders "
+		"with their status history, and order items) for benchmarking at production size."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--products", type=int, default=2000)
+		parser.add_argument("--customers", type=int, default=20000)
+		parser.add_argument("--orders", type=int, default=100000)
+		parser.add_argument(
+			"--max-items",
+			type=int,
+			default=4,
+			help="Maximum number of lines per order (default: 4).",
+		)
+		parser.add_argument(
+			"--days",
+			type=int,
+			default=365,
+			help="Spread order timestamps over this many past days (default: 365).",
+		)
+		parser.add_argument("--seed", type=int, default=42)
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=5000,
+			help="Orders inserted per transaction (default: 5000).",
+		)
+		parser.add_argument(
+			"--prefix",
+			default="bench",
+			help="Prefix for generated usernames and product names (default: bench).",
+		)
+
+	def handle(self, *args, **options):
+		for name in ("products", "customers", "max_items", "days", "batch_size"):
+			if options[name] < 1:
+				raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+		if options["orders"] < 0:
+			raise CommandError("--orders must not be negative.")
+		prefix = options["prefix"]
+		if User.objects.filter(username__startswith=f"{prefix}_customer_").exists():
+			raise CommandError(f"Data with prefix '{prefix}' already exists; pick another --prefix.")
+
+		rng = random.Random(options["seed"])
+		started = time.perf_counter()
+
+		products = self.create_products(rng, prefix, options["products"])
+		customer_ids = self.create_customers(prefix, options["customers"], options["batch_size"])
+		orders, items, events = self.create_orders(rng, products, customer_ids, options)
+
+		self.stdout.write(
+			self.style.SUCCESS(
+				f"Created {len(products)} products, {len(customer_ids)} customers, {orders} orders, "
+				f"{items} order items and {events} status events in {time.perf_counter() - started:.1f}s."
+			)
+		)
+
+	def create_products(self, rng, prefix, count):
+		categories = [key for key, _ in Product.CATEGORY_CHOICES]
+		with transaction.atomic():
+			products = Product.objects.bulk_create(
+				[
+					Product(
+						name=f"{prefix.title()} {categories[i % len(categories)]} {i}",
+						category=categories[i % len(categories)],
+						price=Decimal(rng.randrange(40, 600)),
+						stock=rng.randrange(0, 500),
+						is_active=rng.random() > 0.05,
+					)
+					for i in range(count)
+				],
+				batch_size=1000,
+			)
+		return [(product.id, product.price) for product in products]
+
+	def create_customers(self, prefix, count, batch_size):
+		# Hashing once keeps seeding fast; every customer shares this password.
+		password = make_password(f"{prefix}-password")
+		ids = []
+		for start in range(0, count, batch_size):
+			with transaction.atomic():
+				users = User.objects.bulk_create(
+					[
+						User(
+							username=f"{prefix}_customer_{i}",
+							email=f"{prefix}_customer_{i}@example.com",
+							password=password,
+						)
+						for i in range(start, min(start + batch_size, count))
+					]
+				)
+			ids.extend(user.id for user in users)
+		return ids
+
+	def create_orders(self, rng, products, customer_ids, options):
+		now = timezone.now()
+		# Hours are picked on the shop's clock, so the rushes land where the kitchen report looks.
+		shop_now = timezone.localtime(now, shop_timezone())
+		total_orders = options["orders"]
+		batch_size = options["batch_size"]
+		days = options["days"]
+		max_items = options["max_items"]
+		hours = range(24)
+
+		order_count = 0
+		item_count = 0
+		event_count = 0
+		with _explicit_created_at(Order):
+			for start in range(0, total_orders, batch_size):
+				size = min(batch_size, total_orders - start)
+				orders = []
+				lines = []
+				histories = []
+				for _ in range(size):
+					day = rng.randrange(days)
+					hour = rng.choices(hours, weights=HOUR_WEIGHTS)[0]
+					created_at = (shop_now - timedelta(days=day)).replace(
+						hour=hour, minute=rng.randrange(60), second=rng.randrange(60), microsecond=0
+					)
+					if created_at > now:
+						created_at -= timedelta(days=1)
+					if now - created_at < timedelta(hours=2):
+						status = rng.choice(ACTIVE_STATUSES)
+					else:
+						status = rng.choice(FINISHED_STATUSES)
+					timestamps, history = _timeline(rng, status, created_at, hour, now)
+
+					order_lines = []
+					total = Decimal("0")
+					for product_id, price in rng.sample(products, min(len(products), rng.randint(1, max_items))):
+						quantity = rng.choices((1, 2, 3, 4), weights=(60, 25, 10, 5))[0]
+						total += price * quantity
+						order_lines.append((product_id, quantity, price, rng.choice(ADDONS)))
+					orders.append(
+						Order(
+							customer_id=rng.choice(customer_ids),
+							created_at=created_at,
+							status=status,
+							total_amount=total,
+							**timestamps,
+						)
+					)
+					lines.append(order_lines)
+					histories.append(history)
+
+				with transaction.atomic():
+					Order.objects.bulk_create(orders)
+					items = [
+						OrderItem(
+							order_id=order.id,
+							product_id=product_id,
+							quantity=quantity,
+							unit_price=price,
+							addons=addons,
+						)
+						for order, order_lines in zip(orders, lines)
+						for product_id, quantity, price, addons in order_lines
+					]
+					OrderItem.objects.bulk_create(items)
+					events = [
+						OrderStatusEvent(
+							order_id=order.id,
+							from_status=from_status,
+							to_status=to_status,
+							entered_at=entered_at,
+							created_at=left_at,
+						)
+						for order, history in zip(orders, histories)
+						for from_status, to_status, entered_at, left_at in history
+					]
+					OrderStatusEvent.objects.bulk_create(events)
+
+				order_count += len(orders)
+				item_count += len(items)
+				event_count += len(events)
+				self.stdout.write(f"{order_count}/{total_orders} orders...")
+		return order_count, item_count, event_count
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from chili_app.routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+	help = (
+		"Copy the default SQLite database into the SQLite file configured as the "
+		"replica. Stands in for real replication when testing locally."
+	)
+
+	def handle(self, *args, **options):
+		if REPLICA_ALIAS not in connections.databases:
+			raise CommandError("No 'replica' database configured; set DJANGO_REPLICA_DB_NAME.")
+
+		primary = connections[DEFAULT_DB_ALIAS].settings_dict
+		replica = connections[REPLICA_ALIAS].settings_dict
+		for alias, config in ((DEFAULT_DB_ALIAS, primary), (REPLICA_ALIAS, replica)):
+			if config["ENGINE"] != "django.db.backends.sqlite3":
+				raise CommandError(f"'{alias}' is not SQLite; use the backend's own replication.")
+
+		connections[REPLICA_ALIAS].close()
+		source = sqlite3.connect(str(primary["NAME"]))
+		target = sqlite3.connect(str(replica["NAME"]))
+		try:
+			source.backup(target)
+		finally:
+			target.close()
+			source.close()
+
+		self.stdout.write(self.style.SUCCESS(f"Replica {replica['NAME']} refreshed from {primary['NAME']}."))
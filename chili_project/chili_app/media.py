@@ -0,0 +1,92 @@
+"""Uploaded media: content-hashed file names and WhiteNoise-style serving.
+
+HashedMediaStorage stores every upload as ``<name>.<hash>.<ext>``, so a file's
+URL changes whenever its bytes do and can be cached forever. MediaMiddleware
+serves MEDIA_ROOT ahead of the session and auth middleware with ETag,
+Last-Modified and range support. Hashed files get ``Cache-Control: immutable``
+and other files get MEDIA_MAX_AGE. Full responses go out through
+``wsgi.file_wrapper``, which gunicorn sends with ``sendfile``.
+"""
+
+import hashlib
+import os
+import re
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from whitenoise.base import WhiteNoise
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.\w+$")
+
+
+def content_hash(content) -> str:
+	digest = hashlib.md5(usedforsecurity=False)
+	for chunk in content.chunks():
+		digest.update(chunk)
+	content.seek(0)
+	return digest.hexdigest()[:HASH_LENGTH]
+
+
+class HashedMediaStorage(FileSystemStorage):
+	def save(self, name, content, max_length=None):
+		if name:
+			if not hasattr(content, "chunks"):
+				content = File(content, name)
+			root, ext = os.path.splitext(name)
+			digest = content_hash(content)
+			# A name that merely looks hashed (e.g. an upload called
+			# photo.0123456789ab.jpg) is re-hashed from the actual bytes.
+			if HASHED_NAME.search(name):
+				root = os.path.splitext(root)[0]
+			name = f"{root}.{digest}{ext}"
+		return super().save(name, content, max_length)
+
+	def get_available_name(self, name, max_length=None):
+		# save() always derives the hash from the bytes, so an existing file is this same upload.
+		if HASHED_NAME.search(name) and self.exists(name):
+			return name
+		return super().get_available_name(name, max_length)
+
+	def _save(self, name, content):
+		if self.exists(name):
+			return name
+		return super()._save(name, content)
+
+
+class MediaMiddleware:
+	def __init__(self, get_response):
+		self.get_response = get_response
+		self.prefix = ensure_leading_trailing_slash(urlparse(settings.MEDIA_URL).path)
+		# autorefresh makes add_files() register the directory instead of
+		# scanning it, so uploads made while the server runs are found.
+		self.files = WhiteNoise(
+			None,
+			autorefresh=True,
+			max_age=settings.MEDIA_MAX_AGE,
+			immutable_file_test=lambda path, url: bool(HASHED_NAME.search(url)),
+		)
+		self.files.add_files(settings.MEDIA_ROOT, self.prefix)
+		# Our own lookup cache: autorefresh would otherwise stat the file on every request.
+		self.found = {}
+
+	def __call__(self, request):
+		path = request.path_info
+		if not path.startswith(self.prefix):
+			return self.get_response(request)
+		static_file = self.found.get(path)
+		if static_file is None:
+			static_file = self.files.find_file(path)
+			if static_file is not None:
+				self.found[path] = static_file
+		if static_file is not None:
+			try:
+				return WhiteNoiseMiddleware.serve(static_file, request)
+			except FileNotFoundError:
+				# Deleted since it was first served.
+				self.found.pop(path, None)
+		return self.get_response(request)
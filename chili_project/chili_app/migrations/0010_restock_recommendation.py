@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chili_app', '0009_archived_orders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestockRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_demand', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('weekday_factors', models.JSONField(blank=True, default=list)),
+                ('stock_at_computation', models.PositiveIntegerField(default=0)),
+                ('projected_stockout', models.DateField(blank=True, db_index=True, null=True)),
+                ('recommended_quantity', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='restock', to='chili_app.product')),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chili_app', '0014_order_status_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='pickup_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PickupSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('bottled', 'Bottled Chili Garlic'), ('meal', 'Chili Garlic Meals'), ('snack', 'Snack'), ('drink', 'Drinks')], max_length=20)),
+                ('starts_at', models.DateTimeField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'starts_at'), name='unique_pickup_slot_per_category'), models.CheckConstraint(condition=models.Q(('booked__lte', models.F('capacity'))), name='pickup_slot_within_capacity')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chili_app', '0016_archive_order_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedorder',
+            name='payment_method',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='payment_method',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
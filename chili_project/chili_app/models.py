@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 # Create your models here.
 
@@ -49,13 +50,76 @@ class Order(models.Model):
 		on_delete=models.CASCADE,
 		related_name="orders",
 	)
-	created_at = models.DateTimeField(auto_now_add=True)
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 	status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
 	total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+	# When the order last entered each status (pending is created_at); set by
+	# chili_app.lifecycle.transition().
+	preparing_at = models.DateTimeField(blank=True, null=True)
+	ready_at = models.DateTimeField(blank=True, null=True)
+	completed_at = models.DateTimeField(blank=True, null=True)
+	cancelled_at = models.DateTimeField(blank=True, null=True)
+	# Start of the pickup slot claimed at checkout (chili_app.pickup).
+	pickup_at = models.DateTimeField(blank=True, null=True)
+	payment_method = models.CharField(max_length=20, blank=True)
+
+	STATUS_TIMESTAMP_FIELDS = {
+		STATUS_PENDING: "created_at",
+		STATUS_PREPARING: "preparing_at",
+		STATUS_READY_FOR_PICKUP: "ready_at",
+		STATUS_COMPLETED: "completed_at",
+		STATUS_CANCELLED: "cancelled_at",
+	}
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["customer", "-created_at"]),
+			models.Index(fields=["status", "-created_at"]),
+		]
 
 	def __str__(self) -> str:  # type: ignore[override]
 		return f"Order #{self.pk} by {self.customer}"
 
+	def status_entered_at(self):
+		"""When the order entered its current status (created_at for orders older than the timestamps)."""
+		return getattr(self, self.STATUS_TIMESTAMP_FIELDS[self.status]) or self.created_at
+
+
+class OrderStatusEvent(models.Model):
+	"""One status change of an order.
+
+	``entered_at`` is when the order entered ``from_status``, so
+	``created_at - entered_at`` is the time it spent there. Events outlive
+	their order when ``archive_orders`` moves it (the id is kept), so the
+	FK carries no database constraint and deleting an order leaves them.
+	"""
+
+	order = models.ForeignKey(
+		Order,
+		on_delete=models.DO_NOTHING,
+		db_constraint=False,
+		related_name="status_events",
+	)
+	from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+	to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+	entered_at = models.DateTimeField()
+	created_at = models.DateTimeField(default=timezone.now, db_index=True)
+	changed_by = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.SET_NULL,
+		blank=True,
+		null=True,
+		related_name="+",
+	)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["order", "created_at"]),
+		]
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"Order #{self.order_id}: {self.from_status} → {self.to_status}"
+
 
 class OrderItem(models.Model):
 	order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
@@ -66,3 +130,138 @@ class OrderItem(models.Model):
 
 	def line_total(self) -> float:
 		return float(self.quantity) * float(self.unit_price)
+
+
+class ArchivedOrder(models.Model):
+	"""Completed/cancelled order moved out of the live tables by ``archive_orders``.
+
+	The original order id is kept as the primary key so order numbers shown to
+	customers stay the same after archival.
+	"""
+
+	STATUS_PENDING = Order.STATUS_PENDING
+	STATUS_PREPARING = Order.STATUS_PREPARING
+	STATUS_READY_FOR_PICKUP = Order.STATUS_READY_FOR_PICKUP
+	STATUS_COMPLETED = Order.STATUS_COMPLETED
+	STATUS_CANCELLED = Order.STATUS_CANCELLED
+
+	STATUS_CHOICES = Order.STATUS_CHOICES
+
+	id = models.BigIntegerField(primary_key=True)
+	customer = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="archived_orders",
+	)
+	created_at = models.DateTimeField()
+	status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+	total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+	preparing_at = models.DateTimeField(blank=True, null=True)
+	ready_at = models.DateTimeField(blank=True, null=True)
+	completed_at = models.DateTimeField(blank=True, null=True)
+	cancelled_at = models.DateTimeField(blank=True, null=True)
+	pickup_at = models.DateTimeField(blank=True, null=True)
+	payment_method = models.CharField(max_length=20, blank=True)
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["customer", "-created_at"]),
+		]
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"Archived order #{self.pk} by {self.customer}"
+
+
+class ArchivedOrderItem(models.Model):
+	order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="items")
+	product = models.ForeignKey(Product, on_delete=models.PROTECT)
+	quantity = models.PositiveIntegerField(default=1)
+	unit_price = models.DecimalField(max_digits=8, decimal_places=2)
+	addons = models.CharField(max_length=255, blank=True)
+
+	def line_total(self) -> float:
+		return float(self.quantity) * float(self.unit_price)
+
+
+class RestockRecommendation(models.Model):
+	"""Nightly demand forecast per product, written by ``recommend_restock``."""
+
+	product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name="restock")
+	daily_demand = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+	weekday_factors = models.JSONField(default=list, blank=True)
+	stock_at_computation = models.PositiveIntegerField(default=0)
+	projected_stockout = models.DateField(blank=True, null=True, db_index=True)
+	recommended_quantity = models.PositiveIntegerField(default=0)
+	computed_at = models.DateTimeField()
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"Restock {self.product} (+{self.recommended_quantity})"
+
+
+class SlowQuery(models.Model):
+	"""Aggregated slow-query log entry, one row per normalized SQL fingerprint."""
+
+	fingerprint = models.CharField(max_length=40, unique=True)
+	sql = models.TextField()
+	view_name = models.CharField(max_length=200, blank=True)
+	source = models.CharField(max_length=255, blank=True)
+	param_count = models.PositiveIntegerField(default=0)
+	count = models.PositiveIntegerField(default=0)
+	total_ms = models.FloatField(default=0)
+	max_ms = models.FloatField(default=0)
+	explain = models.TextField(blank=True)
+	first_seen = models.DateTimeField(auto_now_add=True)
+	last_seen = models.DateTimeField(auto_now=True)
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"{self.fingerprint[:8]} ({self.count}×)"
+
+	def average_ms(self) -> float:
+		return self.total_ms / self.count if self.count else 0.0
+
+
+class StockReservation(models.Model):
+	"""Stock held for a customer's cart line until ``expires_at``."""
+
+	customer = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="stock_reservations",
+	)
+	product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reservations")
+	quantity = models.PositiveIntegerField()
+	expires_at = models.DateTimeField(db_index=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["customer", "product"], name="unique_reservation_per_cart_line"),
+		]
+		indexes = [
+			# Covers the active-holds aggregate per product.
+			models.Index(fields=["product", "expires_at", "quantity"]),
+		]
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"{self.quantity} × {self.product} for {self.customer}"
+
+
+class PickupSlot(models.Model):
+	"""Units of one product category booked for pickup in the slot starting at ``starts_at``.
+
+	``booked`` is only changed with conditional UPDATEs in chili_app.pickup.
+	"""
+
+	category = models.CharField(max_length=20, choices=Product.CATEGORY_CHOICES)
+	starts_at = models.DateTimeField()
+	capacity = models.PositiveIntegerField()
+	booked = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["category", "starts_at"], name="unique_pickup_slot_per_category"),
+			models.CheckConstraint(condition=models.Q(booked__lte=models.F("capacity")), name="pickup_slot_within_capacity"),
+		]
+
+	def __str__(self) -> str:  # type: ignore[override]
+		return f"{self.get_category_display()} at {self.starts_at:%Y-%m-%d %H:%M} ({self.booked}/{self.capacity})"
@@ -0,0 +1,75 @@
+"""Paginators for admin changelists over very large tables."""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class LargeTablePaginator(Paginator):
+	"""Paginator that never runs an unbounded COUNT(*) and keeps deep pages narrow.
+
+	* ``count`` uses the planner's row estimate for unfiltered tables on
+	  PostgreSQL and otherwise counts at most ``count_cap`` rows. The page
+	  list then ends at ``count_cap / per_page`` pages (a later ``?p=`` is
+	  out of range); rows beyond that are reached with the newer/older keyset
+	  links of ``admin.KeysetNavigationMixin`` or by narrowing the changelist.
+	* When the queryset is ordered by primary key, a later page first finds
+	  its boundary pk with ``OFFSET`` over the pk column alone and then
+	  fetches the page with ``pk <= boundary`` (or ``>=``). That OFFSET is
+	  still linear in the page depth, but it walks the primary key index
+	  instead of building and discarding every earlier row with its joins.
+	  Numbered pages stay offset-based; the keyset links are the cursor.
+	"""
+
+	count_cap = 10000
+
+	@cached_property
+	def count(self):
+		queryset = self.object_list
+		if not queryset.query.where:
+			estimate = self._estimated_table_rows(queryset)
+			if estimate is not None:
+				return estimate
+		return queryset.order_by().values("pk")[: self.count_cap].count()
+
+	def _estimated_table_rows(self, queryset):
+		connection = connections[queryset.db]
+		if connection.vendor != "postgresql":
+			return None
+		with connection.cursor() as cursor:
+			cursor.execute(
+				"SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+				[queryset.model._meta.db_table],
+			)
+			row = cursor.fetchone()
+		# reltuples is -1 (or 0) until the table has been analyzed.
+		return row[0] if row and row[0] > 0 else None
+
+	def _pk_ordering(self):
+		ordering = self.object_list.query.order_by
+		if not ordering:
+			return None
+		first = ordering[0]
+		if not isinstance(first, str):
+			return None
+		pk_name = self.object_list.model._meta.pk.name
+		if first.lstrip("-") in ("pk", pk_name):
+			return first.startswith("-")
+		return None
+
+	def page(self, number):
+		number = self.validate_number(number)
+		bottom = (number - 1) * self.per_page
+		top = bottom + self.per_page
+		if top + self.orphans >= self.count:
+			top = self.count
+		descending = self._pk_ordering()
+		if bottom == 0 or descending is None:
+			return self._get_page(self.object_list[bottom:top], number, self)
+
+		boundary = list(self.object_list.values_list("pk", flat=True)[bottom : bottom + 1])
+		if not boundary:
+			return self._get_page(self.object_list.none(), number, self)
+		lookup = "pk__lte" if descending else "pk__gte"
+		object_list = self.object_list.filter(**{lookup: boundary[0]})[: top - bottom]
+		return self._get_page(object_list, number, self)
@@ -0,0 +1,146 @@
+"""Capacity-limited pickup slots.
+
+The day is cut into PICKUP_SLOT_MINUTES slots within PICKUP_HOURS, read on the
+shop's clock (PICKUP_TIME_ZONE). Each category in PICKUP_SLOT_CAPACITY may
+have that many units picked up per slot; other categories are unlimited, and
+a cart over a category's capacity cannot be picked up in any slot. PickupSlot rows are the occupancy table:
+checkout claims units with one conditional UPDATE per category (no counting
+of orders), and the slot list shown at checkout is read from a short-lived
+cached copy of the upcoming rows.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OrderItem, PickupSlot
+
+CACHE_VERSION_KEY = "pickup-slots:version"
+CACHE_TIMEOUT = 60
+
+
+def _invalidate() -> None:
+	try:
+		cache.incr(CACHE_VERSION_KEY)
+	except ValueError:
+		cache.set(CACHE_VERSION_KEY, 2, None)
+
+
+def shop_timezone():
+	return ZoneInfo(settings.PICKUP_TIME_ZONE)
+
+
+def upcoming_starts(count: int, now=None):
+	"""The next ``count`` slot starts at least PICKUP_LEAD_MINUTES from now."""
+	tz = shop_timezone()
+	now = timezone.localtime(now or timezone.now(), tz)
+	step = timedelta(minutes=settings.PICKUP_SLOT_MINUTES)
+	earliest = now + timedelta(minutes=settings.PICKUP_LEAD_MINUTES)
+	opens, closes = settings.PICKUP_HOURS
+	day = earliest.date()
+	starts = []
+	while len(starts) < count:
+		start = timezone.make_aware(datetime.combine(day, time(opens)), tz)
+		end = timezone.make_aware(datetime.combine(day, time(closes)), tz)
+		while start < end and len(starts) < count:
+			if start >= earliest:
+				starts.append(start)
+			start += step
+		day += timedelta(days=1)
+	return starts
+
+
+def cart_units(products, cart):
+	"""Units per capacity-limited category in the cart."""
+	units = Counter()
+	for product in products:
+		if product.category in settings.PICKUP_SLOT_CAPACITY:
+			units[product.category] += int(cart.get(str(product.id), 0) or 0)
+	return +units
+
+
+def oversized(units):
+	"""{category: capacity} for the categories in ``units`` no single slot can take."""
+	capacity = settings.PICKUP_SLOT_CAPACITY
+	return {category: capacity[category] for category, qty in units.items() if qty > capacity[category]}
+
+
+def _occupancy(starts):
+	"""{(category, start): booked} for ``starts``, cached briefly."""
+	version = cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+	key = f"pickup-slots:{version}:{starts[0].isoformat()}:{len(starts)}"
+	booked = cache.get(key)
+	if booked is None:
+		booked = {
+			(category, starts_at): count
+			for category, starts_at, count in PickupSlot.objects.filter(
+				starts_at__gte=starts[0], starts_at__lte=starts[-1]
+			).values_list("category", "starts_at", "booked")
+		}
+		cache.set(key, booked, CACHE_TIMEOUT)
+	return booked
+
+
+def available_slots(units, count: int = 8, scan: int = 48):
+	"""Up to ``count`` upcoming slot starts with room for ``units`` ({category: qty})."""
+	starts = upcoming_starts(scan)
+	booked = _occupancy(starts)
+	capacity = settings.PICKUP_SLOT_CAPACITY
+	open_starts = [
+		start
+		for start in starts
+		if all(booked.get((category, start), 0) + qty <= capacity[category] for category, qty in units.items())
+	]
+	return open_starts[:count]
+
+
+def claim_slot(start, units) -> bool:
+	"""Book ``units`` in the slot at ``start``; all categories or none.
+
+	Must run inside the checkout transaction so a later failure releases
+	the claim.
+	"""
+	capacity = settings.PICKUP_SLOT_CAPACITY
+	with transaction.atomic():
+		PickupSlot.objects.bulk_create(
+			[PickupSlot(category=category, starts_at=start, capacity=capacity[category]) for category in units],
+			ignore_conflicts=True,
+		)
+		for category, qty in units.items():
+			claimed = PickupSlot.objects.filter(
+				category=category,
+				starts_at=start,
+				booked__lte=F("capacity") - qty,
+			).update(booked=F("booked") + qty)
+			if not claimed:
+				transaction.set_rollback(True)
+				return False
+	# After the checkout commits: a rollback must not leave the cache claiming
+	# the units are gone, and a read before the commit must not be kept.
+	transaction.on_commit(_invalidate)
+	return True
+
+
+def release_slots(orders) -> None:
+	"""Give back the units booked by ``orders`` (e.g. when they are cancelled)."""
+	orders = [order for order in orders if order.pickup_at]
+	if not orders:
+		return
+	pickup_at = {order.pk: order.pickup_at for order in orders}
+	units = Counter()
+	items = OrderItem.objects.filter(
+		order_id__in=pickup_at,
+		product__category__in=list(settings.PICKUP_SLOT_CAPACITY),
+	).values_list("order_id", "product__category", "quantity")
+	for order_id, category, qty in items:
+		units[(category, pickup_at[order_id])] += qty
+	for (category, start), qty in units.items():
+		PickupSlot.objects.filter(category=category, starts_at=start, booked__gte=qty).update(booked=F("booked") - qty)
+	if units:
+		transaction.on_commit(_invalidate)
@@ -0,0 +1,207 @@
+"""Bulk product import from CSV or JSON Lines.
+
+The whole file is parsed and checked against the catalog before anything is
+written. Rows match existing products by ``id`` when given, otherwise by name
+(case-insensitive); blank cells keep the current value. Creates and updates
+are then applied in one transaction: new rows with bulk_create, changed rows
+as a batched upsert on the primary key, and the sales report cache is
+invalidated once at the end.
+"""
+
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .models import Product
+from .reports import invalidate_sales_report
+
+FIELDS = ("name", "category", "price", "stock", "is_active")
+COLUMNS = ("id",) + FIELDS
+BATCH_SIZE = 500
+MAX_ERRORS = 50
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+CATEGORY_LOOKUP = {
+	**{label.lower(): key for key, label in Product.CATEGORY_CHOICES},
+	**{key: key for key, _ in Product.CATEGORY_CHOICES},
+}
+
+
+def parse_rows(data: bytes, filename: str):
+	"""Rows (dicts) from an uploaded file; ``.jsonl``/``.ndjson`` as JSON Lines, anything else as CSV.
+
+	Raises ValueError when the file itself cannot be read.
+	"""
+	try:
+		text = data.decode("utf-8-sig")
+	except UnicodeDecodeError:
+		raise ValueError("The file must be UTF-8 encoded.")
+
+	if filename.lower().endswith((".jsonl", ".ndjson")):
+		rows = []
+		for number, line in enumerate(text.splitlines(), start=1):
+			if not line.strip():
+				continue
+			try:
+				row = json.loads(line)
+			except json.JSONDecodeError as exc:
+				raise ValueError(f"Line {number}: invalid JSON ({exc.msg}).")
+			if not isinstance(row, dict):
+				raise ValueError(f"Line {number}: expected a JSON object.")
+			rows.append(row)
+		return rows
+
+	reader = csv.DictReader(io.StringIO(text))
+	header = [name.strip().lower() for name in reader.fieldnames or []]
+	unknown = [name for name in header if name not in COLUMNS]
+	if unknown:
+		raise ValueError(f"Unknown column(s): {', '.join(unknown)}. Expected: {', '.join(COLUMNS)}.")
+	if "id" not in header and "name" not in header:
+		raise ValueError("The file needs an id or a name column.")
+	reader.fieldnames = header
+	return list(reader)
+
+
+def _blank(value) -> bool:
+	return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _clean(field, value):
+	if field == "is_active":
+		if isinstance(value, bool):
+			return value
+		text = str(value).strip().lower()
+		if text in TRUE_VALUES:
+			return True
+		if text in FALSE_VALUES:
+			return False
+		raise ValidationError("Enter yes or no.")
+	if isinstance(value, str):
+		value = value.strip()
+	if field == "category":
+		value = CATEGORY_LOOKUP.get(str(value).lower(), value)
+	return Product._meta.get_field(field).clean(value, None)
+
+
+def _plan(rows):
+	"""Match and validate ``rows``; returns (create, update, changes, unchanged, errors)."""
+	existing = list(Product.objects.all())
+	by_id = {product.pk: product for product in existing}
+	by_name = {}
+	for product in existing:
+		by_name.setdefault(product.name.strip().lower(), product)
+
+	create, update, changes, errors = [], [], {}, []
+	unchanged = 0
+	seen = set()
+	for number, row in enumerate(rows, start=1):
+		row_errors = []
+		# csv.DictReader files cells beyond the header under the key None.
+		if None in row:
+			row_errors.append("row has more cells than the header")
+		unknown = sorted(str(key) for key in set(row) - set(COLUMNS) - {None})
+		if unknown:
+			row_errors.append(f"unknown column(s) {', '.join(unknown)}")
+
+		values = {}
+		for field in FIELDS:
+			if _blank(row.get(field)):
+				continue
+			try:
+				values[field] = _clean(field, row[field])
+			except ValidationError as exc:
+				row_errors.append(f"{field}: {' '.join(exc.messages).rstrip('.')}")
+
+		product = None
+		if not _blank(row.get("id")):
+			# bool is an int subclass; {"id": true} must not mean product #1
+			if not isinstance(row["id"], bool):
+				try:
+					product = by_id.get(int(row["id"]))
+				except (TypeError, ValueError):
+					pass
+			if product is None:
+				row_errors.append(f"no product with id {row['id']}")
+		elif "name" in values:
+			product = by_name.get(values["name"].lower())
+			if product is not None:
+				# Matched by name: keep the catalog's spelling
+				del values["name"]
+		elif _blank(row.get("name")):
+			row_errors.append("an id or a name is required")
+
+		if product is None and not row_errors:
+			missing = [field for field in ("name", "price") if field not in values]
+			if missing:
+				row_errors.append(f"new products need {' and '.join(missing)}")
+
+		key = product.pk if product is not None else values.get("name", "").lower()
+		if not row_errors and key in seen:
+			row_errors.append("the same product appears earlier in the file")
+		seen.add(key)
+
+		if row_errors:
+			errors.append(f"Row {number}: {'; '.join(row_errors)}.")
+			if len(errors) >= MAX_ERRORS:
+				errors.append(f"Stopped after {MAX_ERRORS} problems.")
+				break
+			continue
+
+		if product is None:
+			create.append(Product(**values))
+			continue
+		diff = {field: (getattr(product, field), value) for field, value in values.items() if getattr(product, field) != value}
+		if not diff:
+			unchanged += 1
+			continue
+		for field, (_, value) in diff.items():
+			setattr(product, field, value)
+		update.append(product)
+		changes[product.pk] = diff
+
+	return create, update, changes, unchanged, errors
+
+
+def import_products(rows, dry_run: bool = False):
+	"""Validate every row, then create and update products in one transaction.
+
+	Returns ``(summary, errors)``. When any row has a problem nothing is
+	written; with ``dry_run`` the summary is computed but not applied.
+	``summary`` has ``created`` (Products), ``updated`` (list of
+	``(product, [(field, old, new), ...])``) and ``unchanged`` (count).
+	"""
+	with transaction.atomic():
+		create, update, changes, unchanged, errors = _plan(rows)
+		if not errors and not dry_run:
+			Product.objects.bulk_create(create, batch_size=BATCH_SIZE)
+			if update:
+				fields = sorted({field for diff in changes.values() for field in diff})
+				if connection.features.supports_update_conflicts_with_target:
+					# One INSERT ... ON CONFLICT (id) DO UPDATE per batch; far cheaper
+					# than the CASE WHEN statements bulk_update() builds.
+					Product.objects.bulk_create(
+						update,
+						batch_size=BATCH_SIZE,
+						update_conflicts=True,
+						unique_fields=["id"],
+						update_fields=fields,
+					)
+				else:
+					Product.objects.bulk_update(update, fields, batch_size=BATCH_SIZE)
+
+	if not errors and not dry_run and (create or update):
+		invalidate_sales_report()
+
+	summary = {
+		"created": create,
+		"updated": [
+			(product, [(field, old, new) for field, (old, new) in changes[product.pk].items()])
+			for product in update
+		],
+		"unchanged": unchanged,
+	}
+	return summary, errors
@@ -0,0 +1,137 @@
+"""Opt-in cProfile capture for staff requests.
+
+A staff user adds ``?profile=1`` or an ``X-Profile: 1`` header to a request;
+a ``PROFILING_SAMPLE_RATE`` fraction of those requests is run under cProfile.
+Each capture is stored as ``<id>.prof`` plus ``<id>.json`` metadata in
+``PROFILING_DIR``, and the oldest captures are removed once the directory
+grows past ``PROFILING_MAX_BYTES``.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+
+def profiles_dir() -> Path:
+	return Path(settings.PROFILING_DIR)
+
+
+def _wants_profile(request) -> bool:
+	if not settings.PROFILING_ENABLED:
+		return False
+	if request.GET.get("profile") != "1" and request.headers.get("X-Profile") != "1":
+		return False
+	user = getattr(request, "user", None)
+	if user is None or not user.is_staff:
+		return False
+	return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def _prune(directory: Path) -> None:
+	files = sorted(directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+	total = sum(path.stat().st_size for path in files)
+	while files and total > settings.PROFILING_MAX_BYTES:
+		oldest = files.pop(0)
+		total -= oldest.stat().st_size
+		oldest.unlink(missing_ok=True)
+		oldest.with_suffix(".json").unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		if not _wants_profile(request):
+			return self.get_response(request)
+
+		queries = {"count": 0, "time": 0.0}
+
+		def count_queries(execute, sql, params, many, context):
+			start = time.perf_counter()
+			try:
+				return execute(sql, params, many, context)
+			finally:
+				queries["count"] += 1
+				queries["time"] += time.perf_counter() - start
+
+		profiler = cProfile.Profile()
+		start = time.perf_counter()
+		try:
+			profiler.enable()
+		except ValueError:
+			# Another profiler is already running in this process.
+			return self.get_response(request)
+		try:
+			with connection.execute_wrapper(count_queries):
+				response = self.get_response(request)
+				# Render lazily rendered responses inside the profile too.
+				if hasattr(response, "render") and callable(response.render):
+					response.render()
+		finally:
+			profiler.disable()
+		duration = time.perf_counter() - start
+
+		profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+		directory = profiles_dir()
+		directory.mkdir(parents=True, exist_ok=True)
+		profiler.dump_stats(directory / f"{profile_id}.prof")
+		metadata = {
+			"id": profile_id,
+			"method": request.method,
+			"path": request.get_full_path(),
+			"user": request.user.get_username(),
+			"status": response.status_code,
+			"duration_ms": round(duration * 1000, 1),
+			"query_count": queries["count"],
+			"query_ms": round(queries["time"] * 1000, 1),
+			"created_at": time.time(),
+		}
+		(directory / f"{profile_id}.json").write_text(json.dumps(metadata))
+		_prune(directory)
+
+		response["X-Profile-Id"] = profile_id
+		return response
+
+
+def recent_profiles(limit: int = 50) -> list[dict]:
+	directory = profiles_dir()
+	if not directory.is_dir():
+		return []
+	entries = []
+	for path in directory.glob("*.json"):
+		try:
+			entries.append(json.loads(path.read_text()))
+		except (OSError, ValueError):
+			continue
+	entries.sort(key=lambda entry: entry.get("created_at", 0), reverse=True)
+	return entries[:limit]
+
+
+def top_functions(profile_id: str, limit: int = 25) -> list[dict]:
+	"""Return the ``limit`` functions with the highest cumulative time."""
+	path = profiles_dir() / f"{os.path.basename(profile_id)}.prof"
+	if not path.is_file():
+		return []
+	stats = pstats.Stats(str(path))
+	rows = []
+	for (filename, lineno, name), (_, calls, own_time, cumulative, _) in stats.stats.items():
+		rows.append(
+			{
+				"function": name,
+				"location": f"{filename}:{lineno}" if lineno else filename,
+				"calls": calls,
+				"own_ms": round(own_time * 1000, 2),
+				"cumulative_ms": round(cumulative * 1000, 2),
+			}
+		)
+	rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+	return rows[:limit]
@@ -0,0 +1,66 @@
+"""Immutable order receipts rendered once at checkout.
+
+Each receipt is written as ``RECEIPTS_DIR/<order id>/<customer id>.html`` plus
+a plain-text ``.txt`` twin. Keying the file on both ids lets the customer view
+check ownership from the path alone and lets staff find the receipt by order
+id, so serving a receipt needs no database work.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+FORMATS = {"html": "text/html; charset=utf-8", "txt": "text/plain; charset=utf-8"}
+
+
+def receipt_path(order_id: int, customer_id: int, fmt: str = "html") -> Path:
+	return Path(settings.RECEIPTS_DIR) / str(order_id) / f"{customer_id}.{fmt}"
+
+
+def write_receipt(order, lines, payment_method: str = "", pickup_address: str = "") -> None:
+	"""Render and store both receipt formats for ``order``.
+
+	``lines`` are OrderItem-like objects with product, quantity, unit_price,
+	addons and line_total().
+	"""
+	context = {
+		"order": order,
+		"customer": order.customer,
+		"lines": lines,
+		"payment_method": payment_method,
+		"pickup_address": pickup_address,
+		"pickup_time_zone": settings.PICKUP_TIME_ZONE,
+	}
+	for fmt in FORMATS:
+		path = receipt_path(order.id, order.customer_id, fmt)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		# Write then rename so a reader never sees a half-written receipt.
+		fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+		with os.fdopen(fd, "w", encoding="utf-8") as fh:
+			fh.write(render_to_string(f"receipts/receipt.{fmt}", context))
+		os.replace(tmp, path)
+
+
+def read_receipt(order_id: int, customer_id=None, fmt: str = "html"):
+	"""Return the stored receipt bytes, or None if it was never rendered.
+
+	Without ``customer_id`` (staff lookups) whichever receipt exists for the
+	order is returned.
+	"""
+	if customer_id is None:
+		try:
+			names = [name for name in os.listdir(receipt_path(order_id, 0).parent) if name.endswith(f".{fmt}")]
+		except FileNotFoundError:
+			return None
+		if not names:
+			return None
+		path = receipt_path(order_id, 0).parent / names[0]
+	else:
+		path = receipt_path(order_id, customer_id, fmt)
+	try:
+		return path.read_bytes()
+	except FileNotFoundError:
+		return None
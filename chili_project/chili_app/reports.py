@@ -0,0 +1,155 @@
+"""Sales analytics for the staff report page.
+
+Grouping happens in the database (one ``values().annotate()`` query per item
+table), so the Python side only ever sees one row per bucket and category.
+Trend columns are then derived from the dense bucket series with prefix sums
+and offset slices rather than per-bucket lookups.
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import DateField, DecimalField, F, Sum
+from django.db.models.functions import TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, Order, OrderItem, Product
+
+GRANULARITY_DAY = "day"
+GRANULARITY_WEEK = "week"
+GRANULARITIES = (GRANULARITY_DAY, GRANULARITY_WEEK)
+
+# Moving-average window and week-over-week lag, in buckets.
+MOVING_AVERAGE_WINDOW = {GRANULARITY_DAY: 7, GRANULARITY_WEEK: 4}
+WEEK_OVER_WEEK_LAG = {GRANULARITY_DAY: 7, GRANULARITY_WEEK: 1}
+
+CENT = Decimal("0.01")
+
+# Longest range the report page accepts; keeps bucket lists and cache entries small.
+MAX_RANGE_DAYS = 366
+
+CACHE_VERSION_KEY = "sales-report:version"
+CACHE_TIMEOUT = 60 * 60
+
+
+def invalidate_sales_report() -> None:
+	"""Drop every cached report; called when an order becomes completed."""
+	try:
+		cache.incr(CACHE_VERSION_KEY)
+	except ValueError:
+		cache.set(CACHE_VERSION_KEY, 2, None)
+
+
+def _bucket_start(day, granularity):
+	if granularity == GRANULARITY_WEEK:
+		return day - timedelta(days=day.weekday())
+	return day
+
+
+def _bucket_range(start, end, granularity):
+	step = timedelta(days=7 if granularity == GRANULARITY_WEEK else 1)
+	bucket = _bucket_start(start, granularity)
+	buckets = []
+	while bucket <= end:
+		buckets.append(bucket)
+		bucket += step
+	return buckets
+
+
+def _grouped_rows(model, start, end, granularity):
+	trunc = TruncWeek if granularity == GRANULARITY_WEEK else TruncDate
+	tz = timezone.get_current_timezone()
+	return (
+		model.objects.filter(
+			order__status=Order.STATUS_COMPLETED,
+			order__created_at__gte=timezone.make_aware(datetime.combine(start, time.min), tz),
+			order__created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+		)
+		.annotate(bucket=trunc("order__created_at", output_field=DateField()))
+		.values("bucket", "product__category")
+		.annotate(
+			revenue=Sum(
+				F("quantity") * F("unit_price"),
+				output_field=DecimalField(max_digits=14, decimal_places=2),
+			),
+			units=Sum("quantity"),
+		)
+		.order_by()
+	)
+
+
+def moving_average(values, window):
+	"""Trailing mean over ``window`` buckets using a single prefix-sum pass."""
+	prefix = [Decimal("0")]
+	for value in values:
+		prefix.append(prefix[-1] + value)
+	return [
+		(prefix[i + 1] - prefix[max(0, i + 1 - window)]) / min(i + 1, window)
+		for i in range(len(values))
+	]
+
+
+def period_deltas(values, lag):
+	"""Percent change against the value ``lag`` buckets earlier (None if unknown)."""
+	previous = ([None] * lag + list(values))[: len(values)]
+	return [
+		None if not prev else (value - prev) / prev * 100
+		for value, prev in zip(values, previous)
+	]
+
+
+def _build_report(start, end, granularity):
+	buckets = _bucket_range(start, end, granularity)
+	index = {bucket: i for i, bucket in enumerate(buckets)}
+	revenue = [Decimal("0.00")] * len(buckets)
+	units = [0] * len(buckets)
+	category_totals = {
+		key: {"category": key, "label": label, "revenue": Decimal("0.00"), "units": 0}
+		for key, label in Product.CATEGORY_CHOICES
+	}
+
+	# Archived orders are included so long ranges stay complete.
+	for model in (OrderItem, ArchivedOrderItem):
+		for row in _grouped_rows(model, start, end, granularity):
+			i = index.get(row["bucket"])
+			if i is None:
+				continue
+			row_revenue = Decimal(row["revenue"] or 0).quantize(CENT)
+			revenue[i] += row_revenue
+			units[i] += row["units"] or 0
+			category = category_totals.get(row["product__category"])
+			if category is not None:
+				category["revenue"] += row_revenue
+				category["units"] += row["units"] or 0
+
+	averages = moving_average(revenue, MOVING_AVERAGE_WINDOW[granularity])
+	deltas = period_deltas(revenue, WEEK_OVER_WEEK_LAG[granularity])
+	rows = [
+		{
+			"bucket": bucket,
+			"revenue": revenue[i],
+			"units": units[i],
+			"moving_average": averages[i].quantize(CENT),
+			"week_over_week": None if deltas[i] is None else deltas[i].quantize(Decimal("0.1")),
+		}
+		for i, bucket in enumerate(buckets)
+	]
+	return {
+		"rows": rows,
+		"categories": list(category_totals.values()),
+		"total_revenue": sum(revenue, Decimal("0.00")),
+		"total_units": sum(units),
+		"moving_average_window": MOVING_AVERAGE_WINDOW[granularity],
+	}
+
+
+def sales_report(start, end, granularity=GRANULARITY_DAY):
+	"""Return the (cached) sales report for the inclusive date range."""
+	version = cache.get_or_set(CACHE_VERSION_KEY, 1, None)
+	key = f"sales-report:{version}:{start.isoformat()}:{end.isoformat()}:{granularity}"
+	report = cache.get(key)
+	if report is None:
+		report = _build_report(start, end, granularity)
+		cache.set(key, report, CACHE_TIMEOUT)
+	return report
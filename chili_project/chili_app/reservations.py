@@ -0,0 +1,85 @@
+"""Time-limited stock holds for items sitting in customers' carts.
+
+A product's available stock is ``stock`` minus the unexpired holds of other
+customers. Holds are refreshed for ``STOCK_RESERVATION_TTL`` seconds whenever
+the cart line changes, released when the line is removed or the order is
+placed, and expired rows are removed by ``manage.py expire_reservations``.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Product, StockReservation
+
+
+def reserved_by_others(product_ids, customer=None) -> dict:
+	"""Return {product_id: units held by other customers' active holds}."""
+	holds = StockReservation.objects.filter(product_id__in=product_ids, expires_at__gt=timezone.now())
+	if customer is not None:
+		holds = holds.exclude(customer=customer)
+	return dict(holds.values_list("product_id").annotate(total=Sum("quantity")).order_by())
+
+
+def available_stock(products, customer=None) -> dict:
+	"""Return {product_id: units the customer may still put in their cart}."""
+	held = reserved_by_others([product.id for product in products], customer)
+	return {product.id: max(0, (product.stock or 0) - held.get(product.id, 0)) for product in products}
+
+
+def hold_stock(customer, quantities, previous=None) -> dict:
+	"""Set the customer's holds to ``quantities`` ({product_id: cart quantity}).
+
+	A quantity of 0 releases the hold. Returns {product_id: available} for the
+	lines that do not fit, in which case nothing is changed. Lines at or below
+	their ``previous`` cart quantity or their current hold never fail.
+	"""
+	if not quantities:
+		return {}
+	previous = previous or {}
+	now = timezone.now()
+	with transaction.atomic():
+		# Lock the product rows so concurrent holds on them serialize.
+		products = list(Product.objects.select_for_update().filter(id__in=quantities))
+		available = available_stock(products, customer)
+		own = dict(
+			StockReservation.objects.filter(
+				customer=customer,
+				product_id__in=quantities,
+				expires_at__gt=now,
+			).values_list("product_id", "quantity")
+		)
+		shortfalls = {
+			product_id: available.get(product_id, 0)
+			for product_id, quantity in quantities.items()
+			if quantity > max(own.get(product_id, 0), previous.get(product_id, 0))
+			and quantity > available.get(product_id, 0)
+		}
+		if shortfalls:
+			return shortfalls
+
+		released = [product_id for product_id, quantity in quantities.items() if quantity <= 0]
+		if released:
+			StockReservation.objects.filter(customer=customer, product_id__in=released).delete()
+		expires_at = now + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+		StockReservation.objects.bulk_create(
+			[
+				StockReservation(customer=customer, product_id=product_id, quantity=quantity, expires_at=expires_at)
+				for product_id, quantity in quantities.items()
+				if quantity > 0 and product_id in available
+			],
+			update_conflicts=True,
+			unique_fields=["customer", "product"],
+			update_fields=["quantity", "expires_at"],
+		)
+	return {}
+
+
+def release_stock(customer, product_ids=None) -> None:
+	holds = StockReservation.objects.filter(customer=customer)
+	if product_ids is not None:
+		holds = holds.filter(product_id__in=product_ids)
+	holds.delete()
@@ -0,0 +1,115 @@
+"""Database routing for the optional ``replica`` alias.
+
+Only reads that are explicitly tagged with :func:`reporting_reads` go to the
+replica; everything else (and every write) stays on ``default``.  After a
+client writes one of the ``REPORTED_MODELS``, :class:`ReplicaPinningMiddleware`
+pins that client to the primary for ``REPLICA_LAG_TOLERANCE`` seconds so they
+always read their own writes, e.g. staff seeing the status they just set in
+the kitchen metrics. Writes that reports never read (sessions, last_login,
+stock holds, the slow-query log) do not pin, or almost every request would.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE_NAME = "db_primary_pin"
+
+# Models read by views wrapped in reporting_reads(). auth.User is left out on
+# purpose: last_login is written on every login, and a customer list that lags
+# by REPLICA_LAG_TOLERANCE seconds is fine.
+REPORTED_MODELS = {
+	"chili_app.archivedorder",
+	"chili_app.archivedorderitem",
+	"chili_app.order",
+	"chili_app.orderitem",
+	"chili_app.orderstatusevent",
+	"chili_app.product",
+	"chili_app.restockrecommendation",
+}
+
+_reporting = ContextVar("chili_reporting_reads", default=False)
+_pinned = ContextVar("chili_pinned_to_primary", default=False)
+_wrote = ContextVar("chili_wrote_to_primary", default=False)
+
+
+def replica_configured() -> bool:
+	return REPLICA_ALIAS in settings.DATABASES
+
+
+def lag_tolerance() -> int:
+	return int(getattr(settings, "REPLICA_LAG_TOLERANCE", 5))
+
+
+@contextmanager
+def reporting_reads():
+	"""Send reads made inside the block (or decorated view) to the replica.
+
+	Querysets are lazy, so views must be wrapped as a whole to cover reads
+	that happen while rendering the template.
+	"""
+	token = _reporting.set(True)
+	try:
+		yield
+	finally:
+		_reporting.reset(token)
+
+
+class ReplicaRouter:
+	def db_for_read(self, model, **hints):
+		if not _reporting.get() or not replica_configured():
+			return None
+		if _pinned.get() or _wrote.get():
+			return DEFAULT_DB_ALIAS
+		if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+			return DEFAULT_DB_ALIAS
+		return REPLICA_ALIAS
+
+	def db_for_write(self, model, **hints):
+		if model._meta.label_lower in REPORTED_MODELS:
+			_wrote.set(True)
+		return DEFAULT_DB_ALIAS
+
+	def allow_relation(self, obj1, obj2, **hints):
+		# Both aliases hold the same data, so relations across them are fine.
+		return True
+
+	def allow_migrate(self, db, app_label, model_name=None, **hints):
+		# The replica receives its schema from the primary, never from migrate.
+		if db == REPLICA_ALIAS:
+			return False
+		return None
+
+
+class ReplicaPinningMiddleware:
+	"""Keep a client on the primary for a short while after it writes."""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		try:
+			pinned_until = float(request.COOKIES.get(PIN_COOKIE_NAME, 0))
+		except ValueError:
+			pinned_until = 0
+		pinned_token = _pinned.set(pinned_until > time.time())
+		wrote_token = _wrote.set(False)
+		try:
+			response = self.get_response(request)
+			if _wrote.get() and replica_configured():
+				tolerance = lag_tolerance()
+				response.set_cookie(
+					PIN_COOKIE_NAME,
+					str(time.time() + tolerance),
+					max_age=tolerance,
+					httponly=True,
+					samesite="Lax",
+				)
+		finally:
+			_pinned.reset(pinned_token)
+			_wrote.reset(wrote_token)
+		return response
@@ -0,0 +1,81 @@
+"""Cache-first session engine with throttled writes to the database.
+
+Reads come from the cache and only fall back to ``django_session`` on a miss,
+like Django's ``cached_db`` engine. Saves always update the cache, but an
+existing session is written to the database at most once every
+``SESSION_DB_WRITE_INTERVAL`` seconds, so busy carts stop costing an UPDATE
+per click. Saves that change the cart (CART_KEYS) always go to the database
+too, so an evicted or lost cache entry can never bring back a cart that was
+checked out or cleared; only the remaining keys may lag by the interval.
+
+The cache must be shared by every worker serving requests. gunicorn.conf.py
+pins a single worker and refuses to start more while CACHES is a LocMemCache.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+logger = logging.getLogger("django.contrib.sessions")
+
+# Session keys holding the cart; CART_UPDATED_AT (a Unix timestamp) is what
+# `manage.py cleanup_sessions` uses to spot abandoned carts.
+CART_UPDATED_AT = "cart_updated_at"
+CART_KEYS = ("cart", "cart_addons", CART_UPDATED_AT)
+
+
+class SessionStore(CachedDBStore):
+	cache_key_prefix = "chili_app.sessions"
+
+	def _db_synced_key(self, session_key):
+		return f"{self.cache_key_prefix}:synced:{session_key}"
+
+	@staticmethod
+	def _cart_state(data):
+		return {key: data.get(key) for key in CART_KEYS}
+
+	def load(self):
+		data = super().load()
+		# Cart keys are always written through, so the loaded copy matches the database.
+		self._saved_cart = self._cart_state(data)
+		if data.get("cart"):
+			# Abandoned carts are dropped here as well as by cleanup_sessions, which
+			# cannot reach a per-process cache; undated carts get dated so they age out.
+			stamp = data.get(CART_UPDATED_AT)
+			if stamp is None:
+				data[CART_UPDATED_AT] = int(time.time())
+				self.modified = True
+			elif stamp < time.time() - settings.CART_ABANDONED_AFTER:
+				for key in CART_KEYS:
+					data.pop(key, None)
+				self.modified = True
+		return data
+
+	def save(self, must_create=False):
+		interval = getattr(settings, "SESSION_DB_WRITE_INTERVAL", 60)
+		cart = self._cart_state(self._get_session(no_load=must_create))
+		cart_changed = cart != getattr(self, "_saved_cart", None)
+		if must_create or self.session_key is None or interval <= 0 or cart_changed:
+			super().save(must_create)
+			self._cache.set(self._db_synced_key(self.session_key), True, interval)
+			self._saved_cart = cart
+			return
+
+		# cache.add() only succeeds when no DB write happened within the interval.
+		if self._cache.add(self._db_synced_key(self.session_key), True, interval):
+			super().save(must_create)
+			return
+
+		try:
+			self._cache.set(self.cache_key, self._get_session(no_load=False), self.get_expiry_age())
+		except Exception:
+			logger.exception("Error saving to cache (%s)", self._cache)
+			super().save(must_create)
+
+	def delete(self, session_key=None):
+		key = session_key or self.session_key
+		super().delete(session_key)
+		if key is not None:
+			self._cache.delete(self._db_synced_key(key))
@@ -0,0 +1,156 @@
+"""Slow query log for ORM queries issued from ``chili_app`` code.
+
+When ``SLOW_QUERY_LOG_ENABLED`` is set, :class:`SlowQueryMiddleware` times
+every query made while handling a request. Queries slower than
+``SLOW_QUERY_THRESHOLD_MS`` whose call stack passes through this app are
+logged and aggregated into :class:`~chili_app.models.SlowQuery` by normalized
+SQL fingerprint after the response is built. The backend's ``EXPLAIN`` output
+is captured the first time a fingerprint is seen.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Middleware modules appear in every stack; they are never the real caller.
+_IGNORED_FILES = {
+	os.path.join(APP_DIR, name)
+	for name in ("slow_queries.py", "routers.py", "profiling.py")
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+	"""Strip literals and collapse IN-lists so equivalent queries match."""
+	sql = _STRING_LITERAL.sub("?", sql)
+	sql = _NUMBER_LITERAL.sub("?", sql)
+	sql = sql.replace("%s", "?")
+	sql = _PLACEHOLDER_LIST.sub("(...)", sql)
+	return _WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+	return hashlib.sha1(normalized_sql.encode("utf-8")).hexdigest()
+
+
+def _app_caller():
+	"""Return "file:line in function" for the innermost chili_app frame."""
+	frame = sys._getframe(2)
+	while frame is not None:
+		filename = os.path.abspath(frame.f_code.co_filename)
+		if filename.startswith(APP_DIR) and filename not in _IGNORED_FILES:
+			relative = os.path.relpath(filename, os.path.dirname(APP_DIR))
+			return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+		frame = frame.f_back
+	return None
+
+
+def _explain(sql, params):
+	if not sql.lstrip().upper().startswith("SELECT"):
+		return ""
+	prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+	try:
+		with connection.cursor() as cursor:
+			cursor.execute(prefix + sql, params)
+			return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+	except DatabaseError as exc:
+		return f"EXPLAIN failed: {exc}"
+
+
+def record(entries, view_name):
+	for entry in entries:
+		updated = SlowQuery.objects.filter(fingerprint=entry["fingerprint"]).update(
+			count=F("count") + 1,
+			total_ms=F("total_ms") + entry["duration_ms"],
+			max_ms=Greatest(F("max_ms"), entry["duration_ms"]),
+			view_name=view_name,
+			source=entry["source"],
+		)
+		if not updated:
+			SlowQuery.objects.get_or_create(
+				fingerprint=entry["fingerprint"],
+				defaults={
+					"sql": entry["normalized"],
+					"view_name": view_name,
+					"source": entry["source"],
+					"param_count": entry["param_count"],
+					"count": 1,
+					"total_ms": entry["duration_ms"],
+					"max_ms": entry["duration_ms"],
+					"explain": _explain(entry["sql"], entry["params"]),
+				},
+			)
+
+
+class SlowQueryMiddleware:
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		if not settings.SLOW_QUERY_LOG_ENABLED:
+			return self.get_response(request)
+
+		threshold = settings.SLOW_QUERY_THRESHOLD_MS
+		entries = []
+
+		def time_query(execute, sql, params, many, context):
+			start = time.perf_counter()
+			try:
+				return execute(sql, params, many, context)
+			finally:
+				duration_ms = (time.perf_counter() - start) * 1000
+				if duration_ms >= threshold:
+					source = _app_caller()
+					if source is not None:
+						query_params = params[0] if many and params else params
+						normalized = normalize_sql(sql)
+						entries.append(
+							{
+								"sql": sql,
+								"params": query_params,
+								"normalized": normalized,
+								"fingerprint": fingerprint(normalized),
+								"param_count": len(query_params or ()),
+								"duration_ms": round(duration_ms, 2),
+								"source": source,
+							}
+						)
+
+		with connection.execute_wrapper(time_query):
+			response = self.get_response(request)
+
+		if entries:
+			match = getattr(request, "resolver_match", None)
+			view_name = match.view_name if match else request.path
+			for entry in entries:
+				logger.warning(
+					"Slow query %.1f ms in %s (%s) [%s, %d params]: %s",
+					entry["duration_ms"],
+					view_name,
+					entry["source"],
+					entry["fingerprint"][:8],
+					entry["param_count"],
+					entry["normalized"],
+				)
+			try:
+				record(entries, view_name)
+			except DatabaseError:
+				logger.exception("Could not store slow query entries.")
+		return response
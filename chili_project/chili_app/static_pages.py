@@ -0,0 +1,29 @@
+"""Pre-rendered pages for anonymous visitors, served by WhiteNoise.
+
+``manage.py build_static_pages`` renders the pages in PRERENDERED_PAGES into
+PRERENDERED_DIR (which is WHITENOISE_ROOT), so anonymous requests for them are
+answered before the session, CSRF and auth middleware run. Requests carrying
+a session cookie skip the pre-rendered copies and reach the views, which
+redirect signed-in users to their dashboard.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class PrerenderedWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+	"""WhiteNoise that leaves the pre-rendered pages to Django for signed-in sessions."""
+
+	def __call__(self, request):
+		if settings.SESSION_COOKIE_NAME in request.COOKIES and not request.path_info.startswith(self.static_prefix):
+			return self.get_response(request)
+		return super().__call__(request)
+
+	def add_cache_headers(self, headers, path, url):
+		if not Path(path).is_relative_to(settings.PRERENDERED_DIR):
+			return super().add_cache_headers(headers, path, url)
+		headers["Cache-Control"] = f"public, max-age={settings.PRERENDERED_MAX_AGE}"
+		# The same URL is a redirect for signed-in users.
+		headers["Vary"] = "Cookie"
@@ -0,0 +1,47 @@
+"""Template warm-up and render benchmarking helpers."""
+
+import time
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, engines
+
+# The pages with the longest lists; both engines have a version of these.
+HOT_TEMPLATES = ("order_now.html", "my_orders.html", "admin_orders.html")
+
+
+def project_templates(backend):
+	"""Names of the templates in ``backend``'s own directories (not app or admin templates)."""
+	env = getattr(backend, "env", None)
+	if env is not None:
+		return env.list_templates()
+	names = []
+	for directory in backend.engine.dirs:
+		directory = Path(directory)
+		names.extend(str(path.relative_to(directory)) for path in directory.rglob("*") if path.is_file())
+	return names
+
+
+def warm_templates() -> int:
+	"""Compile every project template in every engine so first requests hit the cache.
+
+	Only has a lasting effect with caching loaders, which is always the case
+	outside DEBUG (see settings.py).
+	"""
+	warmed = 0
+	for backend in engines.all():
+		for name in project_templates(backend):
+			try:
+				backend.get_template(name)
+			except TemplateDoesNotExist:
+				continue
+			warmed += 1
+	return warmed
+
+
+def time_render(template, context, request=None, iterations: int = 50) -> float:
+	"""Return the mean render time of ``template`` in milliseconds."""
+	template.render(context, request)
+	started = time.perf_counter()
+	for _ in range(iterations):
+		template.render(context, request)
+	return (time.perf_counter() - started) * 1000 / iterations
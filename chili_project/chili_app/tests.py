@@ -1,3 +1,686 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+import io
+import json
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import urls
+from .admin import OrderAdmin
+from .lifecycle import throughput_by_hour, transition
+from .media import HashedMediaStorage, content_hash
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatusEvent, PickupSlot, Product
+from .paginators import LargeTablePaginator
+from .routers import PIN_COOKIE_NAME, ReplicaPinningMiddleware, ReplicaRouter, reporting_reads
+from .pickup import CACHE_VERSION_KEY, claim_slot, upcoming_starts
+from .product_import import import_products, parse_rows
+from .sessions import CART_UPDATED_AT, SessionStore
 
 # Create your tests here.
+
+
+class AdminChangelistQueryCountTests(TestCase):
+	"""Admin changelists must run a fixed number of queries however many rows exist."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.superuser = User.objects.create_superuser("root", "root@example.com", "pw")
+		cls.products = [
+			Product.objects.create(name=f"Product {i}", category=category, price=Decimal("50.00"), stock=10)
+			for i, (category, _) in enumerate(Product.CATEGORY_CHOICES)
+		]
+
+	def setUp(self):
+		cache.clear()
+		self.client.force_login(self.superuser)
+
+	def add_orders(self, count):
+		for i in range(count):
+			customer = User.objects.create_user(f"customer{Order.objects.count()}")
+			order = Order.objects.create(customer=customer, status=Order.STATUS_COMPLETED, total_amount=100)
+			for product in self.products[:2]:
+				OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+			archived = ArchivedOrder.objects.create(
+				id=100000 + order.id,
+				customer=customer,
+				created_at=order.created_at,
+				status=Order.STATUS_COMPLETED,
+				total_amount=100,
+			)
+			ArchivedOrderItem.objects.create(order=archived, product=self.products[0], quantity=1, unit_price=50)
+
+	def assertChangelistQueries(self, url, expected):
+		# Capped count and rows, plus the date hierarchy range and (all test
+		# orders fall in one month) its day list — never one per row. The
+		# session and user come from the cache once warmed up.
+		for count in (3, 12):
+			self.add_orders(count)
+			self.client.get(url)
+			with self.assertNumQueries(expected):
+				response = self.client.get(url)
+			self.assertEqual(response.status_code, 200)
+
+	def test_order_changelist(self):
+		self.assertChangelistQueries(reverse("admin:chili_app_order_changelist"), 4)
+
+	def test_order_changelist_filtered(self):
+		url = reverse("admin:chili_app_order_changelist") + "?status__exact=completed"
+		self.assertChangelistQueries(url, 4)
+
+	def test_order_changelist_search(self):
+		url = reverse("admin:chili_app_order_changelist") + "?q=customer1"
+		self.assertChangelistQueries(url, 4)
+
+	def test_order_changelist_order_number_search(self):
+		url = reverse("admin:chili_app_order_changelist") + "?q=%231"
+		self.assertChangelistQueries(url, 4)
+
+	def test_order_item_changelist(self):
+		self.assertChangelistQueries(reverse("admin:chili_app_orderitem_changelist"), 2)
+
+	def test_archived_order_changelist(self):
+		self.assertChangelistQueries(reverse("admin:chili_app_archivedorder_changelist"), 2)
+
+	def test_product_changelist(self):
+		self.assertChangelistQueries(reverse("admin:chili_app_product_changelist"), 3)
+
+
+@override_settings(SESSION_DB_WRITE_INTERVAL=60)
+class SessionStoreTests(TestCase):
+	def test_only_cart_changes_write_through(self):
+		cache.clear()
+		store = SessionStore()
+		store["cart"] = {"1": 2}
+		store[CART_UPDATED_AT] = int(time.time())
+		store.create()
+		key = store.session_key
+
+		store = SessionStore(key)
+		store["note"] = "kept in the cache"
+		store.save()
+		self.assertNotIn("note", Session.objects.get(pk=key).get_decoded())
+
+		store = SessionStore(key)
+		store["cart"] = {}
+		store.save()
+		# Drop the cache as an eviction or restart would; the cleared cart must stay cleared.
+		cache.clear()
+		self.assertEqual(SessionStore(key).load()["cart"], {})
+
+	def test_abandoned_and_undated_carts(self):
+		cache.clear()
+		stale = SessionStore()
+		stale.update({"cart": {"1": 2}, CART_UPDATED_AT: int(time.time()) - settings.CART_ABANDONED_AFTER - 1})
+		stale.create()
+		undated = SessionStore()
+		undated["cart"] = {"1": 2}
+		undated.create()
+
+		# Loading (e.g. from a web process's cache) drops the stale cart and dates the other.
+		store = SessionStore(stale.session_key)
+		self.assertNotIn("cart", store.load())
+		self.assertTrue(store.modified)
+		self.assertIn(CART_UPDATED_AT, SessionStore(undated.session_key).load())
+
+	def test_cleanup_skips_sessions_saved_meanwhile(self):
+		cache.clear()
+		stamp = int(time.time()) - settings.CART_ABANDONED_AFTER - 1
+		keys = []
+		for _ in range(2):
+			store = SessionStore()
+			store.update({"cart": {"1": 2}, CART_UPDATED_AT: stamp})
+			store.create()
+			keys.append(store.session_key)
+		undated = SessionStore()
+		undated["cart"] = {"1": 2}
+		undated.create()
+
+		decode = SessionStore().decode
+
+		def customer_saves_first(session_data):
+			# The second session is saved by its customer after the command read it.
+			data = decode(session_data)
+			if Session.objects.filter(pk=keys[1], session_data=session_data).exists():
+				Session.objects.filter(pk=keys[1]).update(session_data=SessionStore().encode({**data, "note": "new"}))
+			return data
+
+		with mock.patch.object(SessionStore, "decode", side_effect=customer_saves_first, autospec=False):
+			call_command("cleanup_sessions", pause=0, stdout=io.StringIO())
+
+		sessions = {session.pk: session.get_decoded() for session in Session.objects.all()}
+		self.assertNotIn("cart", sessions[keys[0]])
+		self.assertEqual(sessions[keys[1]]["note"], "new")
+		self.assertIn(CART_UPDATED_AT, sessions[undated.session_key])
+
+
+class SalesReportRangeTests(TestCase):
+	def test_range_is_bounded_and_weeks_start_on_monday(self):
+		self.client.force_login(User.objects.create_user("staff", is_staff=True))
+		today = timezone.localdate()
+
+		response = self.client.get(reverse("admin_sales_report"), {"start": "0001-01-01", "end": "9999-12-31"})
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.context["end"], today)
+		self.assertEqual((response.context["end"] - response.context["start"]).days, 365)
+
+		response = self.client.get(reverse("admin_sales_report"), {"start": "2026-03-04", "end": "2026-03-20", "granularity": "week"})
+		self.assertEqual(response.context["start"].isoformat(), "2026-03-02")
+
+
+class ArchiveOrdersTests(TestCase):
+	def test_archive_keeps_timestamps_and_status_history(self):
+		order = Order.objects.create(customer=User.objects.create_user("customer"), pickup_at=timezone.now())
+		transition([order], Order.STATUS_PREPARING)
+		transition([order], Order.STATUS_COMPLETED)
+		Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - timedelta(days=30))
+
+		with self.assertRaises(CommandError):
+			call_command("archive_orders", days=0, stdout=io.StringIO())
+		call_command("archive_orders", days=7, stdout=io.StringIO())
+
+		archived = ArchivedOrder.objects.get(pk=order.pk)
+		self.assertFalse(Order.objects.exists())
+		self.assertEqual(
+			(archived.preparing_at, archived.completed_at, archived.pickup_at),
+			(order.preparing_at, order.completed_at, order.pickup_at),
+		)
+		self.assertEqual(OrderStatusEvent.objects.filter(order_id=order.pk).count(), 2)
+
+
+class KitchenThroughputTests(TestCase):
+	def test_hours_are_on_the_shop_clock(self):
+		customer = User.objects.create_user("customer")
+		order = Order.objects.create(customer=customer)
+		# 04:30 UTC yesterday is 12:30 in Manila.
+		placed = (timezone.now() - timedelta(days=1)).astimezone(dt_timezone.utc).replace(hour=4, minute=30)
+		Order.objects.filter(pk=order.pk).update(created_at=placed)
+		OrderStatusEvent.objects.create(
+			order=order,
+			from_status=Order.STATUS_PENDING,
+			to_status=Order.STATUS_PREPARING,
+			entered_at=placed,
+			created_at=placed + timedelta(minutes=10),
+		)
+		[row] = throughput_by_hour()
+		self.assertEqual((row["hour"], row["placed"], row["statuses"][0]["p50"]), (12, 1, 10))
+
+	def test_seed_bench_records_status_history(self):
+		call_command("seed_bench", products=5, customers=5, orders=200, days=7, stdout=io.StringIO())
+		finished = Order.objects.filter(status=Order.STATUS_COMPLETED)
+		self.assertFalse(finished.filter(preparing_at=None).exists())
+		self.assertFalse(finished.filter(completed_at=None).exists())
+		self.assertEqual(
+			OrderStatusEvent.objects.filter(to_status=Order.STATUS_COMPLETED).count(),
+			finished.count(),
+		)
+		lunch = next(row for row in throughput_by_hour(days=7) if row["hour"] == 12)
+		self.assertTrue(all(cell["count"] for cell in lunch["statuses"]))
+
+
+@override_settings(LOGIN_THROTTLE_ENABLED=True, LOGIN_THROTTLE_IP_CAPACITY=3, LOGIN_THROTTLE_USERNAME_CAPACITY=3)
+class LoginThrottleTests(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	def test_failures_are_counted_and_success_is_free(self):
+		User.objects.create_user("customer", password="right")
+		login = reverse("login")
+		for _ in range(2):
+			self.client.post(login, {"username": "customer", "password": "wrong"})
+		self.client.post(login, {"username": "customer", "password": "right"})
+		self.client.logout()
+		self.client.post(login, {"username": "customer", "password": "wrong"})
+		response = self.client.post(login, {"username": "customer", "password": "right"})
+		self.assertEqual(response.status_code, 429)
+
+	def test_success_clears_the_username(self):
+		User.objects.create_user("customer", password="right")
+		login = reverse("login")
+
+		def attempt(password, n):
+			# A new address each time, so only the username bucket fills up.
+			return self.client.post(login, {"username": "customer", "password": password}, REMOTE_ADDR=f"10.0.1.{n}")
+
+		for n in range(2):
+			attempt("wrong", n)
+		attempt("right", 2)
+		self.client.logout()
+		for n in range(3, 5):
+			attempt("wrong", n)
+		self.assertEqual(attempt("right", 5).status_code, 302)
+		self.client.logout()
+		for n in range(6, 9):
+			attempt("wrong", n)
+		self.assertEqual(attempt("right", 9).status_code, 429)
+
+	def test_forwarded_for_needs_a_trusted_proxy(self):
+		login = reverse("login")
+		for n in range(3):
+			self.client.post(login, {"username": f"user{n}", "password": "x"}, HTTP_X_FORWARDED_FOR=f"10.0.0.{n}")
+		response = self.client.post(login, {"username": "user9", "password": "x"}, HTTP_X_FORWARDED_FOR="10.0.0.9")
+		self.assertEqual(response.status_code, 429)
+
+		cache.clear()
+		with override_settings(TRUSTED_PROXY_COUNT=1):
+			for n in range(4):
+				response = self.client.post(login, {"username": f"user{n}", "password": "x"}, HTTP_X_FORWARDED_FOR=f"10.0.0.{n}")
+		self.assertEqual(response.status_code, 200)
+
+
+class HashedMediaStorageTests(TestCase):
+	def test_names_are_hashed_from_content(self):
+		storage = HashedMediaStorage(location=tempfile.mkdtemp())
+		first = storage.save("products/photo.0123456789ab.jpg", ContentFile(b"first"))
+		second = storage.save("products/photo.0123456789ab.jpg", ContentFile(b"second"))
+		self.assertNotEqual(first, second)
+		self.assertEqual(first, f"products/photo.{content_hash(ContentFile(b'first'))}.jpg")
+		with storage.open(second) as fh:
+			self.assertEqual(fh.read(), b"second")
+		self.assertEqual(storage.save("products/again.jpg", ContentFile(b"first")), f"products/again.{first.split('.')[-2]}.jpg")
+
+
+@mock.patch("chili_app.routers.replica_configured", return_value=True)
+class ReplicaRouterTests(SimpleTestCase):
+	def test_reporting_reads_and_pinning(self, _):
+		router = ReplicaRouter()
+
+		def view(write_model):
+			def get_response(request):
+				with reporting_reads():
+					before = router.db_for_read(Order)
+					router.db_for_write(write_model)
+					after = router.db_for_read(Order)
+				return HttpResponse(f"{before} {after}")
+			return ReplicaPinningMiddleware(get_response)
+
+		request = RequestFactory().get("/")
+		self.assertEqual(router.db_for_read(Order), None)
+
+		response = view(Session)(request)
+		self.assertEqual(response.content, b"replica replica")
+		self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+		response = view(Order)(request)
+		self.assertEqual(response.content, b"replica default")
+		self.assertIn(PIN_COOKIE_NAME, response.cookies)
+
+		request.COOKIES[PIN_COOKIE_NAME] = response.cookies[PIN_COOKIE_NAME].value
+		self.assertEqual(view(Session)(request).content, b"default default")
+
+
+class LargeTablePaginatorTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		customer = User.objects.create_user("customer")
+		Order.objects.bulk_create([Order(customer=customer) for _ in range(45)])
+
+	def test_seek_pages_match_offset_pages(self):
+		for ordering in ("-id", "id", "created_at"):
+			queryset = Order.objects.order_by(ordering)
+			paginator = LargeTablePaginator(queryset, 10)
+			self.assertEqual(paginator.num_pages, 5)
+			for number in paginator.page_range:
+				expected = list(queryset.values_list("id", flat=True)[(number - 1) * 10 : number * 10])
+				self.assertEqual([order.id for order in paginator.page(number)], expected)
+
+	def test_count_is_capped(self):
+		paginator = LargeTablePaginator(Order.objects.order_by("-id"), 10)
+		paginator.count_cap = 20
+		self.assertEqual(paginator.count, 20)
+
+	@mock.patch.object(OrderAdmin, "list_per_page", 10)
+	@mock.patch.object(LargeTablePaginator, "count_cap", 20)
+	def test_keyset_links_reach_past_the_cap(self):
+		self.client.force_login(User.objects.create_superuser("root", "root@example.com", "pw"))
+		url = reverse("admin:chili_app_order_changelist")
+
+		def visit(query):
+			response = self.client.get(url + query)
+			return [order.pk for order in response.context["cl"].result_list], response.context["keyset"]
+
+		ids, keyset = visit("")
+		self.assertTrue(keyset["capped"])
+		pages, query = [ids], keyset["older"]
+		while query is not None:
+			ids, keyset = visit(query)
+			pages.append(ids)
+			query = keyset["older"]
+		self.assertEqual(sum(pages, []), list(Order.objects.order_by("-id").values_list("id", flat=True)))
+
+		back, query = [], keyset["newer"]
+		while query is not None:
+			ids, keyset = visit(query)
+			back.append(ids)
+			query = keyset["newer"]
+		self.assertEqual(back, pages[-2::-1])
+
+
+@override_settings(PICKUP_SLOT_CAPACITY={Product.CATEGORY_MEAL: 3})
+class PickupSlotTests(TestCase):
+	def test_claim_stops_at_capacity_and_cancel_releases(self):
+		start = upcoming_starts(1)[0]
+		self.assertTrue(claim_slot(start, {Product.CATEGORY_MEAL: 2}))
+		self.assertFalse(claim_slot(start, {Product.CATEGORY_MEAL: 2}))
+		self.assertTrue(claim_slot(start, {Product.CATEGORY_MEAL: 1}))
+
+		product = Product.objects.create(name="Meal", category=Product.CATEGORY_MEAL, price=Decimal("100"))
+		order = Order.objects.create(customer=User.objects.create_user("customer"), pickup_at=start)
+		order.items.create(product=product, quantity=2, unit_price=product.price)
+		transition([order], Order.STATUS_CANCELLED)
+		transition([order], Order.STATUS_PENDING)
+		transition([order], Order.STATUS_CANCELLED)
+		self.assertEqual(PickupSlot.objects.get().booked, 1)
+
+	def test_availability_cache_is_bumped_on_commit(self):
+		start = upcoming_starts(1)[0]
+		version = cache.get(CACHE_VERSION_KEY)
+		with transaction.atomic():
+			claim_slot(start, {Product.CATEGORY_MEAL: 1})
+			transaction.set_rollback(True)
+		self.assertEqual(cache.get(CACHE_VERSION_KEY), version)
+
+		with self.captureOnCommitCallbacks(execute=True):
+			claim_slot(start, {Product.CATEGORY_MEAL: 1})
+			self.assertEqual(cache.get(CACHE_VERSION_KEY), version)
+		self.assertNotEqual(cache.get(CACHE_VERSION_KEY), version)
+
+	def test_slots_follow_the_shop_clock(self):
+		# 01:00 UTC is 09:00 in Manila: the first slot opens at 10:00 there, 02:00 UTC.
+		now = datetime(2026, 3, 2, 1, 0, tzinfo=dt_timezone.utc)
+		self.assertEqual(upcoming_starts(1, now=now)[0], datetime(2026, 3, 2, 2, 0, tzinfo=dt_timezone.utc))
+
+	def test_cart_larger_than_a_slot_is_explained(self):
+		customer = User.objects.create_user("customer")
+		product = Product.objects.create(name="Meal", category=Product.CATEGORY_MEAL, price=Decimal("100"), stock=10)
+		self.client.force_login(customer)
+		self.client.post(reverse("customer_cart_add", args=[product.id]), {"quantity": 4})
+
+		response = self.client.get(reverse("customer_checkout"))
+		self.assertEqual(response.context["pickup_slots"], [])
+		self.assertContains(response, "too large for one pickup time")
+		response = self.client.post(reverse("customer_checkout"), {"pickup_slot": upcoming_starts(1)[0].isoformat()}, follow=True)
+		self.assertIn("too large for one pickup time", str(list(response.context["messages"])[0]))
+		self.assertFalse(Order.objects.exists())
+
+
+class CheckoutStockTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		receipts = override_settings(RECEIPTS_DIR=tempfile.mkdtemp())
+		receipts.enable()
+		self.addCleanup(receipts.disable)
+
+	def test_stock_is_decremented_in_the_database(self):
+		customer = User.objects.create_user("customer")
+		product = Product.objects.create(name="Jar", price=Decimal("150"), stock=10)
+		self.client.force_login(customer)
+		self.client.post(reverse("customer_cart_add", args=[product.id]), {"quantity": 3})
+		slot = upcoming_starts(1)[0].isoformat()
+
+		# Another checkout spends the stock after this request's availability check.
+		Product.objects.filter(pk=product.pk).update(stock=2)
+		with mock.patch("chili_app.views.available_stock", return_value={product.id: 10}):
+			self.client.post(reverse("customer_checkout"), {"pickup_slot": slot})
+		self.assertFalse(Order.objects.exists())
+		product.refresh_from_db()
+		self.assertEqual(product.stock, 2)
+
+		Product.objects.filter(pk=product.pk).update(stock=10)
+		self.client.post(reverse("customer_checkout"), {"pickup_slot": slot})
+		product.refresh_from_db()
+		self.assertEqual((Order.objects.count(), product.stock), (1, 7))
+
+
+@override_settings(RECEIPTS_DIR=tempfile.mkdtemp())
+class ReceiptTests(TestCase):
+	def setUp(self):
+		receipts = override_settings(RECEIPTS_DIR=tempfile.mkdtemp())
+		receipts.enable()
+		self.addCleanup(receipts.disable)
+
+	def test_etag_does_not_bypass_ownership(self):
+		owner = User.objects.create_user("owner")
+		order = Order.objects.create(customer=owner, payment_method="cash")
+		url = reverse("customer_order_receipt", args=[order.id])
+		etag = f'"receipt-{order.id}-html"'
+
+		self.client.force_login(User.objects.create_user("someone"))
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+		self.assertEqual(self.client.get(reverse("customer_order_receipt", args=[order.id + 1]), HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+		# Receipts rendered after the fact still carry the payment method and address.
+		self.client.force_login(owner)
+		response = self.client.get(url)
+		self.assertContains(response, "Payment: Cash")
+		self.assertContains(response, "Pickup at:")
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+	def test_receipt_failure_does_not_undo_checkout(self):
+		customer = User.objects.create_user("customer")
+		product = Product.objects.create(name="Jar", price=Decimal("150"), stock=10)
+		self.client.force_login(customer)
+		self.client.post(reverse("customer_cart_add", args=[product.id]), {"quantity": 1})
+
+		with mock.patch("chili_app.views.write_receipt", side_effect=OSError("disk full")):
+			with self.captureOnCommitCallbacks(execute=True):
+				response = self.client.post(reverse("customer_checkout"), {"pickup_slot": upcoming_starts(1)[0].isoformat()})
+		self.assertRedirects(response, reverse("customer_my_orders"))
+		order = Order.objects.get()
+		response = self.client.get(reverse("customer_order_receipt", args=[order.id]))
+		self.assertContains(response, "Jar")
+
+
+class ProductImportTests(TestCase):
+	def test_import_is_all_or_nothing(self):
+		jar = Product.objects.create(name="Classic Jar", price=Decimal("150"), stock=5)
+		good = b"name,category,price,stock\nclassic jar,,155,20\nFish Crackers,Snack,45.50,10\n"
+		bad = good + b"Broken,,not-a-price,1\n"
+
+		summary, errors = import_products(parse_rows(bad, "restock.csv"))
+		self.assertEqual(errors, ["Row 3: price: \u201cnot-a-price\u201d value must be a decimal number."])
+		self.assertEqual(Product.objects.count(), 1)
+
+		summary, errors = import_products(parse_rows(good, "restock.csv"))
+		self.assertEqual(errors, [])
+		self.assertEqual(summary["updated"], [(jar, [("price", Decimal("150.00"), Decimal("155")), ("stock", 5, 20)])])
+		jar.refresh_from_db()
+		self.assertEqual((jar.name, jar.price, jar.stock), ("Classic Jar", Decimal("155.00"), 20))
+		self.assertTrue(Product.objects.filter(name="Fish Crackers", category=Product.CATEGORY_SNACK).exists())
+
+	def test_problems_are_reported_per_row(self):
+		jar = Product.objects.create(name="Classic Jar", price=Decimal("150"), stock=5)
+		rows = parse_rows(b"name,price\nA,1,extra\nClassic Jar,160\nclassic jar,170\n", "restock.csv")
+		rows += [{"id": 999, "stock": 1}, {"id": True, "stock": 1}, {"name": "B", "price": 1, "colour": "red"}]
+
+		summary, errors = import_products(rows)
+		self.assertEqual(
+			errors,
+			[
+				"Row 1: row has more cells than the header.",
+				"Row 3: the same product appears earlier in the file.",
+				"Row 4: no product with id 999.",
+				"Row 5: no product with id True.",
+				"Row 6: unknown column(s) colour.",
+			],
+		)
+		jar.refresh_from_db()
+		self.assertEqual((Product.objects.count(), jar.price), (1, Decimal("150.00")))
+		with self.assertRaises(ValueError):
+			parse_rows(b"name,colour\nA,red\n", "restock.csv")
+
+	def test_jsonl_and_dry_run(self):
+		jar = Product.objects.create(name="Classic Jar", price=Decimal("150"), stock=5)
+		data = f'{{"id": {jar.id}, "stock": 9, "is_active": false}}\n\n{{"name": "Chili Oil", "category": "bottled", "price": 99}}\n'
+		rows = parse_rows(data.encode(), "restock.jsonl")
+
+		summary, errors = import_products(rows, dry_run=True)
+		self.assertEqual(errors, [])
+		self.assertEqual((len(summary["created"]), len(summary["updated"])), (1, 1))
+		jar.refresh_from_db()
+		self.assertEqual((Product.objects.count(), jar.stock, jar.is_active), (1, 5, True))
+
+		import_products(rows)
+		jar.refresh_from_db()
+		self.assertEqual((Product.objects.count(), jar.stock, jar.is_active), (2, 9, False))
+
+
+VIEW_BUDGETS = Path(__file__).with_name("view_budgets.json")
+
+
+class ViewBudgetTests(TestCase):
+	"""Every route, as each kind of visitor, against the budgets in view_budgets.json.
+
+	A view fails if it runs more queries than its budget. The write paths GET
+	cannot reach (checkout, the cart API, product import) are budgeted from the
+	POSTs in ``posts()``. Render times are recorded too but only checked with
+	VIEW_BENCH_TIMING=1, since the baseline depends on the machine: a view then
+	fails if it is slower than its baseline by more than VIEW_BENCH_TOLERANCE
+	(a fraction, default 1.0) plus a small allowance for timer noise. Run with
+	VIEW_BENCH_UPDATE=1 to rewrite the baseline after an intended change.
+	"""
+
+	ROLES = ("anonymous", "customer", "staff")
+	RUNS = 3
+	NOISE_MS = 20.0
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+		cls.customer = User.objects.create_user("customer", password="pw")
+		other = User.objects.create_user("other", password="pw")
+		products = [
+			Product.objects.create(name=f"{label} {i}", category=category, price=Decimal("75.00"), stock=50)
+			for category, label in Product.CATEGORY_CHOICES
+			for i in range(3)
+		]
+		statuses = [status for status, _ in Order.STATUS_CHOICES]
+		for customer in (cls.customer, other):
+			for i in range(20):
+				order = Order.objects.create(customer=customer, status=statuses[i % len(statuses)], total_amount=225)
+				for product in products[i % 3 : i % 3 + 3]:
+					OrderItem.objects.create(order=order, product=product, quantity=1, unit_price=product.price)
+		archived = ArchivedOrder.objects.create(
+			id=100000,
+			customer=cls.customer,
+			created_at=order.created_at,
+			status=Order.STATUS_COMPLETED,
+			total_amount=75,
+		)
+		ArchivedOrderItem.objects.create(order=archived, product=products[0], quantity=1, unit_price=75)
+		cls.kwargs = {
+			"pk": products[0].id,
+			"product_id": products[0].id,
+			"order_id": cls.customer.orders.order_by("id").first().id,
+		}
+
+	def setUp(self):
+		cache.clear()
+		receipts = override_settings(RECEIPTS_DIR=tempfile.mkdtemp())
+		receipts.enable()
+		self.addCleanup(receipts.disable)
+
+	def routes(self):
+		for pattern in urls.urlpatterns:
+			kwargs = {name: self.kwargs[name] for name in pattern.pattern.converters}
+			yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+	def client_for(self, role):
+		client = Client()
+		if role != "anonymous":
+			client.force_login(getattr(self, role))
+		return client
+
+	def posts(self):
+		"""(route name, role, prepare) for each budgeted POST.
+
+		``prepare(client, run)`` sets up the client's session and returns the
+		keyword arguments for ``client.post``.
+		"""
+		product_id = self.kwargs["product_id"]
+
+		def cart_api(client, run):
+			changes = [{"product_id": product_id, "op": "add", "quantity": 2}]
+			return {"data": json.dumps({"changes": changes}), "content_type": "application/json"}
+
+		def checkout(client, run):
+			session = client.session
+			session["cart"] = {str(product_id): 1}
+			session.save()
+			return {"data": {"pickup_slot": upcoming_starts(1)[0].isoformat()}}
+
+		def product_import(client, run):
+			# A new stock level every run, so each import really updates its rows.
+			rows = "".join(f"{product.id},,,,{run + 100},\n" for product in Product.objects.order_by("id")[:10])
+			upload = ContentFile(f"id,name,category,price,stock,is_active\n{rows}".encode(), name="products.csv")
+			return {"data": {"file": upload}}
+
+		yield "customer_cart_api", "customer", cart_api
+		yield "customer_checkout", "customer", checkout
+		yield "admin_product_import", "staff", product_import
+
+	def measure(self, role, url, prepare=None):
+		"""Return (max queries, best render ms) over a few warmed-up requests.
+
+		Requests are GETs, or POSTs built by ``prepare`` when it is given.
+		"""
+		queries, timings = 0, []
+		for run in range(self.RUNS + 1):
+			# A fresh login each run, since some routes (logout) end the session.
+			client = self.client_for(role)
+			if prepare is None:
+				send = lambda: client.get(url)
+			else:
+				kwargs = prepare(client, run)
+				send = lambda: client.post(url, **kwargs)
+			with CaptureQueriesContext(connection) as captured:
+				started = time.perf_counter()
+				send()
+				elapsed = (time.perf_counter() - started) * 1000
+			if run:
+				# The first run only warms up caches.
+				timings.append(elapsed)
+				queries = max(queries, len(captured))
+		return queries, min(timings)
+
+	def test_views_stay_within_budget(self):
+		results = {}
+		for name, url in self.routes():
+			for role in self.ROLES:
+				queries, ms = self.measure(role, url)
+				results[f"{name} {role}"] = {"queries": queries, "ms": round(ms, 1)}
+		for name, role, prepare in self.posts():
+			queries, ms = self.measure(role, reverse(name), prepare)
+			results[f"{name} {role} POST"] = {"queries": queries, "ms": round(ms, 1)}
+
+		if os.environ.get("VIEW_BENCH_UPDATE"):
+			VIEW_BUDGETS.write_text(json.dumps(results, indent="\t", sort_keys=True) + "\n")
+			return
+
+		budgets = json.loads(VIEW_BUDGETS.read_text())
+		check_timing = bool(os.environ.get("VIEW_BENCH_TIMING"))
+		tolerance = float(os.environ.get("VIEW_BENCH_TOLERANCE", "1.0"))
+		for key, measured in results.items():
+			with self.subTest(view=key):
+				self.assertIn(key, budgets, "No budget recorded; rerun with VIEW_BENCH_UPDATE=1.")
+				budget = budgets[key]
+				self.assertLessEqual(measured["queries"], budget["queries"], "Query budget exceeded.")
+				if check_timing:
+					allowed = budget["ms"] * (1 + tolerance) + self.NOISE_MS
+					self.assertLessEqual(measured["ms"], allowed, f"Render time regressed (baseline {budget['ms']}ms).")
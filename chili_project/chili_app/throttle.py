@@ -0,0 +1,81 @@
+"""Cache-backed counters used to throttle failed logins.
+
+Each counter allows ``limit`` attempts per key in a fixed window of
+``window`` seconds, counted with an atomic ``cache.add`` plus ``cache.incr``.
+The login view counts the client IP *before* the password is checked, so a
+burst of parallel attempts cannot all slip through on the same stale count,
+and gives the attempt back on success. The username is only checked up
+front; it is counted when the password turns out wrong and reset by a
+successful login, so a user's own typos do not linger after they get in.
+State is kept in the default cache, so counters are shared between workers
+when a shared cache backend is configured (and per-process with the default
+LocMemCache).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class FixedWindowCounter:
+	def __init__(self, scope: str, limit: int, window: int):
+		self.scope = scope
+		self.limit = limit
+		self.window = window
+
+	def _cache_key(self, key: str) -> str:
+		return f"throttle:{self.scope}:{key}:{int(time.time() // self.window)}"
+
+	def acquire(self, key: str) -> bool:
+		"""Count an attempt for ``key``; False once the window's limit is exceeded."""
+		cache_key = self._cache_key(key)
+		cache.add(cache_key, 0, self.window)
+		try:
+			count = cache.incr(cache_key)
+		except ValueError:
+			# Expired between add() and incr().
+			cache.add(cache_key, 1, self.window)
+			count = 1
+		return count <= self.limit
+
+	def exceeded(self, key: str) -> bool:
+		"""Whether ``key`` has used up the window's attempts, without counting one."""
+		return (cache.get(self._cache_key(key)) or 0) >= self.limit
+
+	def release(self, key: str) -> None:
+		"""Give back an attempt that turned out not to be a failure."""
+		try:
+			cache.decr(self._cache_key(key))
+		except ValueError:
+			pass
+
+	def reset(self, key: str) -> None:
+		cache.delete(self._cache_key(key))
+
+
+def login_counters() -> tuple[FixedWindowCounter, FixedWindowCounter]:
+	"""Return the (per-IP, per-username) counters for failed logins."""
+	return (
+		FixedWindowCounter("login-ip", settings.LOGIN_THROTTLE_IP_CAPACITY, settings.LOGIN_THROTTLE_REFILL_SECONDS),
+		FixedWindowCounter(
+			"login-user",
+			settings.LOGIN_THROTTLE_USERNAME_CAPACITY,
+			settings.LOGIN_THROTTLE_REFILL_SECONDS,
+		),
+	)
+
+
+def client_ip(request) -> str:
+	"""The client address, read from X-Forwarded-For only behind TRUSTED_PROXY_COUNT proxies.
+
+	Each trusted proxy appends the address it saw, so the client is the entry
+	that many places from the end; anything before it is supplied by the
+	client and can be forged. Without a proxy the header is ignored.
+	"""
+	proxies = settings.TRUSTED_PROXY_COUNT
+	if proxies > 0:
+		hops = [hop.strip() for hop in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if hop.strip()]
+		if len(hops) >= proxies:
+			return hops[-proxies]
+	return request.META.get("REMOTE_ADDR", "")
@@ -8,17 +8,25 @@ urlpatterns = [
 	path('register/', views.register_view, name='register'),
 	path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
 	path('admin/products/', views.admin_products, name='admin_products'),
+	path('admin/products/import/', views.admin_product_import, name='admin_product_import'),
 	path('admin/products/<int:pk>/', views.admin_product_edit, name='admin_product_edit'),
 	path('admin/products/<int:pk>/delete/', views.admin_product_delete, name='admin_product_delete'),
 	path('admin/orders/', views.admin_orders, name='admin_orders'),
+	path('admin/orders/<int:order_id>/receipt/', views.admin_order_receipt, name='admin_order_receipt'),
 	path('admin/customers/', views.admin_customers, name='admin_customers'),
+	path('admin/reports/sales/', views.admin_sales_report, name='admin_sales_report'),
+	path('admin/reports/kitchen/', views.admin_kitchen_metrics, name='admin_kitchen_metrics'),
+	path('admin/profiles/', views.admin_profiles, name='admin_profiles'),
+	path('admin/slow-queries/', views.admin_slow_queries, name='admin_slow_queries'),
 	path('customer/dashboard/', views.customer_dashboard, name='customer_dashboard'),
 	path('customer/order-now/', views.customer_order_now, name='customer_order_now'),
 	path('customer/products/<int:product_id>/', views.customer_product_detail, name='customer_product_detail'),
 	path('customer/my-orders/', views.customer_my_orders, name='customer_my_orders'),
+	path('customer/my-orders/<int:order_id>/receipt/', views.customer_order_receipt, name='customer_order_receipt'),
 	path('customer/cart/', views.customer_cart_view, name='customer_cart'),
 	path('customer/cart/update/<int:product_id>/', views.customer_cart_update, name='customer_cart_update'),
 	path('customer/cart/add/<int:product_id>/', views.customer_cart_add, name='customer_cart_add'),
+	path('customer/cart/api/', views.customer_cart_api, name='customer_cart_api'),
 	path('customer/checkout/', views.customer_checkout, name='customer_checkout'),
 	path('customer/profile/', views.customer_profile, name='customer_profile'),
 ]
@@ -1,25 +1,62 @@
 from decimal import Decimal
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+import json
 import os
+import time
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Count, Sum
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 
 from .forms import CustomerRegistrationForm, ProductForm, ProfileForm
-from .models import Product, Order, OrderItem
+from .lifecycle import queue_depth, throughput_by_hour, transition
+from .models import ArchivedOrder, Product, Order, OrderItem, RestockRecommendation, SlowQuery
+from .pickup import available_slots, cart_units, claim_slot, oversized, shop_timezone, upcoming_starts
+from .product_import import import_products, parse_rows
+from .profiling import recent_profiles, top_functions
+from .receipts import FORMATS as RECEIPT_FORMATS, read_receipt, write_receipt
+from .reservations import available_stock, hold_stock, release_stock
+from .reports import GRANULARITIES, GRANULARITY_DAY, GRANULARITY_WEEK, MAX_RANGE_DAYS, invalidate_sales_report, sales_report
+from .routers import reporting_reads
+from .sessions import CART_UPDATED_AT
+from .throttle import client_ip, login_counters
 
 # Create your views here.
 
+PICKUP_ADDRESS = "Brgy. Parag-um, Carigara, Leyte."
+
 
 def home(request):
+	# Anonymous visitors normally get the pre-rendered copy from WhiteNoise
+	# (see static_pages.py); this view only runs for sessions or before a build.
+	if request.user.is_authenticated:
+		if request.user.is_staff:
+			return redirect("admin_dashboard")
+		return redirect("customer_dashboard")
+
 	return render(request, "home.html")
 
 
+_superuser_exists = False
+
+
+def superuser_exists() -> bool:
+	"""Whether any superuser exists; memoized once True since it never flips back."""
+	global _superuser_exists
+	if not _superuser_exists:
+		_superuser_exists = User.objects.filter(is_superuser=True).exists()
+	return _superuser_exists
+
+
 def login_view(request):
 	if request.user.is_authenticated:
 		if request.user.is_staff:
@@ -30,6 +67,18 @@ def login_view(request):
 		username = request.POST.get("username")
 		password = request.POST.get("password")
 		remember_me = request.POST.get("remember_me")
+
+		# Reject throttled clients before spending CPU on password hashing. The
+		# IP attempt is counted up front and given back on success; the username
+		# is counted only on failure and cleared by a successful login.
+		throttled = settings.LOGIN_THROTTLE_ENABLED
+		if throttled:
+			ip_counter, username_counter = login_counters()
+			ip, username_key = client_ip(request), (username or "").lower()
+			if not ip_counter.acquire(ip) or username_counter.exceeded(username_key):
+				messages.error(request, "Too many failed login attempts. Please try again in a few minutes.")
+				return render(request, "login.html", status=429)
+
 		user = authenticate(request, username=username, password=password)
 		# On Render we might not have a way to run createsuperuser from the shell.
 		# Allow bootstrapping the first admin account using environment variables.
@@ -39,9 +88,9 @@ def login_view(request):
 			if (
 				initial_admin_username
 				and initial_admin_password
-				and not User.objects.filter(is_superuser=True).exists()
 				and username == initial_admin_username
 				and password == initial_admin_password
+				and not superuser_exists()
 			):
 				user = User.objects.create_superuser(
 					username=initial_admin_username,
@@ -49,6 +98,9 @@ def login_view(request):
 					password=initial_admin_password,
 				)
 		if user is not None:
+			if throttled:
+				ip_counter.release(ip)
+				username_counter.reset(username_key)
 			login(request, user)
 			if remember_me:
 				request.session.set_expiry(60 * 60 * 24 * 14)
@@ -57,6 +109,8 @@ def login_view(request):
 			if user.is_staff:
 				return redirect("admin_dashboard")
 			return redirect("customer_dashboard")
+		if throttled:
+			username_counter.acquire(username_key)
 		messages.error(request, "Invalid username or password.")
 
 	return render(request, "login.html")
@@ -86,6 +140,7 @@ def register_view(request):
 
 
 @login_required
+@reporting_reads()
 def admin_dashboard(request):
 	if not request.user.is_staff:
 		return redirect("customer_dashboard")
@@ -121,12 +176,20 @@ def admin_dashboard(request):
 		.prefetch_related("items__product")[:10]
 	)
 
+	restock_recommendations = (
+		RestockRecommendation.objects.filter(recommended_quantity__gt=0)
+		.select_related("product")
+		# SQLite sorts NULLs first; products with no projected stock-out are the least urgent.
+		.order_by(F("projected_stockout").asc(nulls_last=True), "-recommended_quantity")[:8]
+	)
+
 	context = {
 		"today_orders_count": today_orders_count,
 		"week_revenue": week_revenue,
 		"top_product_name": top_product_name,
 		"top_product_quantity": top_product_quantity,
 		"recent_orders": recent_orders,
+		"restock_recommendations": restock_recommendations,
 	}
 	return render(request, "admin_dashboard.html", context)
 
@@ -136,13 +199,18 @@ def customer_dashboard(request):
 	if request.user.is_staff:
 		return redirect("admin_dashboard")
 
-	total_orders = Order.objects.filter(customer=request.user).count()
+	# Archived orders still count towards the customer's lifetime totals.
+	archived = ArchivedOrder.objects.filter(customer=request.user).aggregate(
+		count=Count("id"),
+		total=Sum("total_amount"),
+	)
+	total_orders = Order.objects.filter(customer=request.user).count() + archived["count"]
 	pending_orders = Order.objects.filter(customer=request.user, status=Order.STATUS_PENDING).count()
 	total_spent = (
 		Order.objects.filter(customer=request.user)
 		.aggregate(total=Sum("total_amount"))["total"]
 		or Decimal("0")
-	)
+	) + (archived["total"] or Decimal("0"))
 	order_history = (
 		Order.objects.filter(customer=request.user)
 		.order_by("-created_at")
@@ -180,6 +248,11 @@ def customer_product_detail(request, product_id: int):
 	return render(request, "view_product.html", {"product": product})
 
 
+def _stamp_cart(request):
+	"""Record when the cart last changed, for the abandoned-cart cleanup."""
+	request.session[CART_UPDATED_AT] = int(time.time())
+
+
 @login_required
 def customer_cart_add(request, product_id: int):
 	if request.user.is_staff:
@@ -196,12 +269,6 @@ def customer_cart_add(request, product_id: int):
 		if quantity < 1:
 			quantity = 1
 
-		# Check stock availability
-		available = product.stock or 0
-		if available <= 0:
-			messages.error(request, f"{product.name} is currently out of stock.")
-			return redirect("customer_order_now")
-
 		cart = request.session.get("cart", {})
 		key = str(product.id)
 		try:
@@ -209,12 +276,17 @@ def customer_cart_add(request, product_id: int):
 		except ValueError:
 			current_qty = 0
 
-		# Prevent cart quantity from exceeding available stock
-		if current_qty + quantity > available:
-			messages.error(
-				request,
-				f"Only {available} × {product.name} left in stock.",
-			)
+		# Hold the stock; fails if other carts already hold what is left
+		shortfalls = hold_stock(request.user, {product.id: current_qty + quantity})
+		if shortfalls:
+			available = shortfalls[product.id]
+			if available <= 0:
+				messages.error(request, f"{product.name} is currently out of stock.")
+			else:
+				messages.error(
+					request,
+					f"Only {available} × {product.name} left in stock.",
+				)
 			return redirect("customer_order_now")
 
 		# Optional add-ons / notes
@@ -222,6 +294,7 @@ def customer_cart_add(request, product_id: int):
 
 		cart[key] = current_qty + quantity
 		request.session["cart"] = cart
+		_stamp_cart(request)
 
 		if addons:
 			cart_addons = request.session.get("cart_addons", {})
@@ -237,16 +310,8 @@ def customer_cart_add(request, product_id: int):
 	return redirect("customer_order_now")
 
 
-@login_required
-def customer_cart_view(request):
-	if request.user.is_staff:
-		return redirect("admin_dashboard")
-
-	cart = request.session.get("cart", {})
-	cart_addons = request.session.get("cart_addons", {})
-	ids = [int(pk) for pk in cart.keys()]
-	products = Product.objects.filter(id__in=ids)
-
+def _build_cart_items(products, cart, cart_addons):
+	"""Return (items, total) for the products currently in the session cart."""
 	items = []
 	total = Decimal("0")
 	for product in products:
@@ -257,6 +322,20 @@ def customer_cart_view(request):
 		total += line_total
 		addons = cart_addons.get(str(product.id), "")
 		items.append({"product": product, "quantity": qty, "line_total": line_total, "addons": addons})
+	return items, total
+
+
+@login_required
+def customer_cart_view(request):
+	if request.user.is_staff:
+		return redirect("admin_dashboard")
+
+	cart = request.session.get("cart", {})
+	cart_addons = request.session.get("cart_addons", {})
+	ids = [int(pk) for pk in cart.keys()]
+	products = Product.objects.filter(id__in=ids)
+
+	items, total = _build_cart_items(products, cart, cart_addons)
 
 	context = {"items": items, "total": total}
 	return render(request, "cart.html", context)
@@ -287,19 +366,20 @@ def customer_cart_update(request, product_id: int):
 		qty = 0
 
 	if op == "inc":
-		# Increase quantity only if it does not exceed available stock
-		available = product.stock or 0
-		if available <= 0:
+		# Increase quantity only if the extra unit can be held
+		shortfalls = hold_stock(request.user, {product.id: qty + 1})
+		if not shortfalls:
+			qty += 1
+		elif shortfalls[product.id] <= 0:
 			messages.error(request, "No more stock available for this product.")
-		elif qty + 1 > available:
+		else:
 			messages.error(
 				request,
-				f"Only {available} × {product.name} left in stock.",
+				f"Only {shortfalls[product.id]} × {product.name} left in stock.",
 			)
-		else:
-			qty += 1
 	elif op == "dec":
 		qty -= 1
+		hold_stock(request.user, {product.id: max(qty, 0)}, previous={product.id: qty + 1})
 
 	if qty <= 0:
 		# Remove item (and its addons) when quantity reaches 0
@@ -312,9 +392,163 @@ def customer_cart_update(request, product_id: int):
 		cart[key] = qty
 
 	request.session["cart"] = cart
+	_stamp_cart(request)
 	return redirect("customer_cart")
 
 
+CART_API_OPS = {"add", "inc", "dec", "set", "remove"}
+
+
+def _parse_cart_changes(body):
+	"""Validate the JSON body of a cart API request.
+
+	Returns a list of ``(product_id, op, quantity, addons)`` tuples, or raises
+	ValueError with a message suitable for the client.
+	"""
+	try:
+		payload = json.loads(body or b"{}")
+	except ValueError:
+		raise ValueError("Request body must be JSON.")
+	changes = payload.get("changes") if isinstance(payload, dict) else None
+	if not isinstance(changes, list) or not changes:
+		raise ValueError("Expected a non-empty \"changes\" list.")
+
+	parsed = []
+	for change in changes:
+		if not isinstance(change, dict):
+			raise ValueError("Each change must be an object.")
+		try:
+			product_id = int(change.get("product_id"))
+			quantity = int(change.get("quantity", 1))
+		except (TypeError, ValueError):
+			raise ValueError("product_id and quantity must be integers.")
+		op = str(change.get("op") or ("set" if "quantity" in change else "add")).strip().lower()
+		if op not in CART_API_OPS:
+			raise ValueError(f"Unknown op \"{op}\".")
+		if quantity < 0:
+			raise ValueError("quantity must not be negative.")
+		addons = change.get("addons")
+		addons = str(addons).strip() if addons is not None else None
+		parsed.append((product_id, op, quantity, addons))
+	return parsed
+
+
+def _cart_payload(items, total):
+	return {
+		"lines": [
+			{
+				"product_id": row["product"].id,
+				"name": row["product"].name,
+				"unit_price": str(row["product"].price),
+				"quantity": row["quantity"],
+				"line_total": str(row["line_total"]),
+				"addons": row["addons"],
+			}
+			for row in items
+		],
+		"total": str(total),
+		"item_count": sum(row["quantity"] for row in items),
+	}
+
+
+@login_required
+@require_POST
+def customer_cart_api(request):
+	"""Apply a batch of cart changes in one request and return the new cart.
+
+	The body is ``{"changes": [{"product_id", "op", "quantity", "addons"}]}``
+	where ``op`` is one of add/inc/dec/set/remove. Changes are applied in
+	order; the batch is rejected as a whole if any line would exceed the stock
+	not held by other carts. Accepted lines refresh their stock holds.
+	"""
+	if request.user.is_staff:
+		return JsonResponse({"ok": False, "errors": [{"message": "Staff accounts cannot order."}]}, status=403)
+
+	try:
+		changes = _parse_cart_changes(request.body)
+	except ValueError as exc:
+		return JsonResponse({"ok": False, "errors": [{"message": str(exc)}]}, status=400)
+
+	cart = request.session.get("cart", {})
+	cart_addons = request.session.get("cart_addons", {})
+	new_cart = dict(cart)
+	new_addons = dict(cart_addons)
+
+	for product_id, op, quantity, addons in changes:
+		key = str(product_id)
+		try:
+			current = int(new_cart.get(key, 0) or 0)
+		except ValueError:
+			current = 0
+		if op == "add":
+			current += max(quantity, 1)
+		elif op == "inc":
+			current += 1
+		elif op == "dec":
+			current -= 1
+		elif op == "set":
+			current = quantity
+		else:
+			current = 0
+
+		if current <= 0:
+			new_cart.pop(key, None)
+			new_addons.pop(key, None)
+		else:
+			new_cart[key] = current
+			if addons:
+				new_addons[key] = addons
+
+	ids = {int(pk) for pk in cart.keys()} | {int(pk) for pk in new_cart.keys()}
+	products = {product.id: product for product in Product.objects.filter(id__in=ids)}
+
+	errors = []
+	for key, qty in new_cart.items():
+		product = products.get(int(key))
+		previous = int(cart.get(key, 0) or 0)
+		if qty <= previous:
+			# Reducing a line never needs stock.
+			continue
+		if product is None or not product.is_active:
+			errors.append({"product_id": int(key), "message": "This product is no longer available."})
+
+	if not errors:
+		# Hold every changed line at once; the batch fails if any line falls short.
+		changed = {key for key in cart.keys() | new_cart.keys() if cart.get(key) != new_cart.get(key)}
+		shortfalls = hold_stock(
+			request.user,
+			{int(key): int(new_cart.get(key, 0) or 0) for key in changed},
+			previous={int(key): int(cart.get(key, 0) or 0) for key in changed},
+		)
+		for product_id, available in sorted(shortfalls.items()):
+			product = products[product_id]
+			if available <= 0:
+				errors.append({"product_id": product_id, "message": f"{product.name} is currently out of stock."})
+			else:
+				errors.append({"product_id": product_id, "message": f"Only {available} × {product.name} left in stock."})
+
+	ordered = [products[pk] for pk in sorted(products)]
+	if errors:
+		items, total = _build_cart_items(ordered, cart, cart_addons)
+		return JsonResponse({"ok": False, "errors": errors, **_cart_payload(items, total)}, status=409)
+
+	request.session["cart"] = new_cart
+	request.session["cart_addons"] = new_addons
+	_stamp_cart(request)
+	items, total = _build_cart_items(ordered, new_cart, new_addons)
+	return JsonResponse({"ok": True, "errors": [], **_cart_payload(items, total)})
+
+
+def _too_large_for_pickup(units) -> str:
+	"""Why no pickup slot can take the cart, or "" when one can."""
+	limits = oversized(units)
+	if not limits:
+		return ""
+	labels = dict(Product.CATEGORY_CHOICES)
+	caps = " and ".join(f"{capacity} × {labels[category]}" for category, capacity in limits.items())
+	return f"This order is too large for one pickup time: the kitchen can prepare at most {caps} per slot. Please split it into smaller orders."
+
+
 @login_required
 def customer_checkout(request):
 	if request.user.is_staff:
@@ -333,39 +567,44 @@ def customer_checkout(request):
 		messages.error(request, "Your cart is empty.")
 		return redirect("customer_cart")
 
+	units = cart_units(products, cart)
+	too_large = _too_large_for_pickup(units)
+
 	if request.method == "GET":
-		items = []
-		total = Decimal("0")
-		for product in products:
-			qty = int(cart.get(str(product.id), 0))
-			if qty <= 0:
-				continue
-			line_total = product.price * qty
-			total += line_total
-			addons = cart_addons.get(str(product.id), "")
-			items.append({
-				"product": product,
-				"quantity": qty,
-				"line_total": line_total,
-				"addons": addons,
-			})
+		items, total = _build_cart_items(products, cart, cart_addons)
 
 		context = {
 			"items": items,
 			"total": total,
-			"pickup_address": "Brgy. Parag-um, Carigara, Leyte.",
+			"pickup_address": PICKUP_ADDRESS,
+			"pickup_slots": [] if too_large else available_slots(units),
+			"pickup_too_large": too_large,
+			"pickup_time_zone": settings.PICKUP_TIME_ZONE,
 		}
 		return render(request, "checkout.html", context)
 
 	# POST: place order (pickup only)
-	payment_method = (request.POST.get("payment_method") or "cash").strip().lower()
+	if too_large:
+		messages.error(request, too_large)
+		return redirect("customer_cart")
+
+	payment_method = (request.POST.get("payment_method") or "cash").strip().lower()[:20]
+
+	try:
+		pickup_at = datetime.fromisoformat(request.POST.get("pickup_slot") or "")
+	except ValueError:
+		pickup_at = None
+	if pickup_at not in upcoming_starts(48):
+		messages.error(request, "Please choose one of the available pickup times.")
+		return redirect("customer_checkout")
 
-	# Validate stock before creating the order
+	# Validate stock before creating the order; other carts' holds are not ours to take
+	available_by_product = available_stock(products, request.user)
 	for product in products:
 		qty = int(cart.get(str(product.id), 0))
 		if qty <= 0:
 			continue
-		available = product.stock or 0
+		available = available_by_product[product.id]
 		if available < qty:
 			messages.error(
 				request,
@@ -373,31 +612,45 @@ def customer_checkout(request):
 			)
 			return redirect("customer_cart")
 
-	order = Order.objects.create(customer=request.user)
-	total = Decimal("0")
-	for product in products:
-		qty = int(cart.get(str(product.id), 0))
-		if qty <= 0:
-			continue
-		line_total = product.price * qty
-		total += line_total
-		addons = cart_addons.get(str(product.id), "")
-		order.items.create(product=product, quantity=qty, unit_price=product.price, addons=addons)
-
-		# Decrease stock now that the order has been placed
-		if product.stock is not None:
-			new_stock = (product.stock or 0) - qty
-			if new_stock < 0:
-				new_stock = 0
-			product.stock = new_stock
-			product.save(update_fields=["stock"])
-
-	order.total_amount = total
-	order.save()
+	with transaction.atomic():
+		# Claim the slot first; a full slot stops the order before anything is written
+		if not claim_slot(pickup_at, units):
+			messages.error(request, "That pickup time has just filled up. Please choose another.")
+			return redirect("customer_checkout")
+
+		order = Order.objects.create(customer=request.user, pickup_at=pickup_at, payment_method=payment_method)
+		total = Decimal("0")
+		lines = []
+		for product in products:
+			qty = int(cart.get(str(product.id), 0))
+			if qty <= 0:
+				continue
+
+			# Decrement in the database so concurrent checkouts cannot both spend the same units
+			if not Product.objects.filter(pk=product.pk, stock__gte=qty).update(stock=F("stock") - qty):
+				transaction.set_rollback(True)
+				messages.error(request, f"{product.name} sold out while you were checking out. Please review your cart.")
+				return redirect("customer_cart")
+
+			line_total = product.price * qty
+			total += line_total
+			addons = cart_addons.get(str(product.id), "")
+			lines.append(order.items.create(product=product, quantity=qty, unit_price=product.price, addons=addons))
+
+		order.total_amount = total
+		order.save()
+		# Written once the order is committed, so disk trouble cannot undo a paid
+		# order or hold the slot and stock locks; a missing receipt is rendered
+		# on first view (_receipt_response).
+		transaction.on_commit(
+			lambda: write_receipt(order, lines, payment_method, PICKUP_ADDRESS),
+			robust=True,
+		)
+	release_stock(request.user)
 	request.session["cart"] = {}
 	request.session["cart_addons"] = {}
 
-	where = "for pickup"
+	where = f"for pickup at {timezone.localtime(pickup_at, shop_timezone()):%Y-%m-%d %H:%M}"
 
 	messages.success(
 		request,
@@ -449,16 +702,70 @@ def customer_my_orders(request):
 		.prefetch_related("items__product")
 	)
 
+	# Old orders live in the archive tables; only read them when asked for.
+	show_full_history = request.GET.get("history") == "all"
+	if show_full_history:
+		archived_orders = (
+			ArchivedOrder.objects.filter(customer=request.user)
+			.order_by("-created_at")
+			.prefetch_related("items__product")
+		)
+		past_orders = sorted(
+			[*past_orders, *archived_orders],
+			key=lambda order: order.created_at,
+			reverse=True,
+		)
+
 	return render(
 		request,
 		"my_orders.html",
 		{
 			"active_orders": active_orders,
 			"past_orders": past_orders,
+			"show_full_history": show_full_history,
 		},
 	)
 
 
+def _receipt_response(request, order_id: int, customer_id=None):
+	"""Serve a stored receipt, rendering it first for orders placed before receipts existed."""
+	fmt = request.GET.get("format", "html")
+	if fmt not in RECEIPT_FORMATS:
+		fmt = "html"
+	# Existence and ownership come first (the receipt path includes the
+	# customer id); only then may a matching ETag short-circuit to 304.
+	content = read_receipt(order_id, customer_id, fmt)
+	if content is None:
+		lookup = {"pk": order_id}
+		if customer_id is not None:
+			lookup["customer_id"] = customer_id
+		order = (
+			Order.objects.filter(**lookup).select_related("customer").first()
+			or ArchivedOrder.objects.filter(**lookup).select_related("customer").first()
+		)
+		if order is None:
+			raise Http404("No receipt for this order.")
+		write_receipt(order, list(order.items.select_related("product")), order.payment_method, PICKUP_ADDRESS)
+		content = read_receipt(order_id, order.customer_id, fmt)
+	etag = f'"receipt-{order_id}-{fmt}"'
+	if request.headers.get("If-None-Match") == etag:
+		response = HttpResponseNotModified()
+	else:
+		response = HttpResponse(content, content_type=RECEIPT_FORMATS[fmt])
+	# Receipts never change once written; let the browser keep them.
+	response["Cache-Control"] = "private, max-age=31536000, immutable"
+	response["ETag"] = etag
+	return response
+
+
+@login_required
+def customer_order_receipt(request, order_id: int):
+	if request.user.is_staff:
+		return redirect("admin_order_receipt", order_id=order_id)
+
+	return _receipt_response(request, order_id, request.user.id)
+
+
 @login_required
 def admin_products(request):
 	if not request.user.is_staff:
@@ -528,6 +835,44 @@ def admin_product_edit(request, pk: int):
 	return render(request, "product.html", context)
 
 
+@login_required
+def admin_product_import(request):
+	if not request.user.is_staff:
+		return redirect("customer_dashboard")
+
+	summary = None
+	errors = []
+	dry_run = False
+	if request.method == "POST":
+		upload = request.FILES.get("file")
+		dry_run = bool(request.POST.get("dry_run"))
+		if upload is None:
+			messages.error(request, "Choose a CSV or JSONL file to import.")
+			return redirect("admin_product_import")
+		try:
+			rows = parse_rows(upload.read(), upload.name)
+		except ValueError as exc:
+			messages.error(request, str(exc))
+			return redirect("admin_product_import")
+
+		summary, errors = import_products(rows, dry_run=dry_run)
+		if errors:
+			messages.error(request, "Nothing was imported. Fix the rows listed below and upload the file again.")
+		elif not dry_run:
+			messages.success(
+				request,
+				f"Imported {len(rows)} rows: {len(summary['created'])} created, "
+				f"{len(summary['updated'])} updated, {summary['unchanged']} unchanged.",
+			)
+
+	context = {
+		"summary": summary,
+		"errors": errors,
+		"dry_run": dry_run,
+	}
+	return render(request, "product_import.html", context)
+
+
 @login_required
 def admin_product_delete(request, pk: int):
 	if not request.user.is_staff:
@@ -544,19 +889,39 @@ def admin_product_delete(request, pk: int):
 
 
 @login_required
+@reporting_reads()
 def admin_customers(request):
 	if not request.user.is_staff:
 		return redirect("customer_dashboard")
 
+	archived_counts = (
+		ArchivedOrder.objects.filter(customer=OuterRef("pk"))
+		.order_by()
+		.values("customer")
+		.annotate(count=Count("id"))
+		.values("count")
+	)
 	customers = (
 		User.objects.filter(is_staff=False)
-		.annotate(order_count=Count("orders"))
+		.annotate(
+			order_count=Count("orders")
+			+ Coalesce(Subquery(archived_counts, output_field=IntegerField()), 0)
+		)
 		.order_by("-date_joined")
 	)
 
 	return render(request, "customers.html", {"customers": customers})
 
 
+@login_required
+def admin_order_receipt(request, order_id: int):
+	"""Receipt lookup for the pickup counter."""
+	if not request.user.is_staff:
+		return redirect("customer_order_receipt", order_id=order_id)
+
+	return _receipt_response(request, order_id)
+
+
 @login_required
 def admin_orders(request):
 	if not request.user.is_staff:
@@ -577,8 +942,10 @@ def admin_orders(request):
 		if order_id and new_status in allowed_statuses:
 			try:
 				order = Order.objects.get(pk=order_id)
-				order.status = new_status
-				order.save()
+				was_completed = order.status == Order.STATUS_COMPLETED
+				transition([order], new_status, changed_by=request.user)
+				if was_completed != (new_status == Order.STATUS_COMPLETED):
+					invalidate_sales_report()
 				messages.success(request, f"Updated Order #{order.id} status.")
 			except Order.DoesNotExist:
 				messages.error(request, "Order not found.")
@@ -593,4 +960,107 @@ def admin_orders(request):
 		.prefetch_related("items__product")
 	)
 
-	return render(request, "admin_orders.html", {"orders": orders})
+	context = {
+		"orders": orders,
+		"pickup_time_zone": settings.PICKUP_TIME_ZONE,
+	}
+	return render(request, "admin_orders.html", context)
+
+
+@login_required
+@reporting_reads()
+def admin_sales_report(request):
+	if not request.user.is_staff:
+		return redirect("customer_dashboard")
+
+	today = timezone.localdate()
+	try:
+		end = date.fromisoformat(request.GET.get("end", "")) if request.GET.get("end") else today
+		start = (
+			date.fromisoformat(request.GET.get("start", ""))
+			if request.GET.get("start")
+			else end - timedelta(days=29)
+		)
+	except ValueError:
+		messages.error(request, "Dates must be in YYYY-MM-DD format.")
+		end = today
+		start = end - timedelta(days=29)
+	if start > end:
+		start, end = end, start
+
+	granularity = request.GET.get("granularity", GRANULARITY_DAY)
+	if granularity not in GRANULARITIES:
+		granularity = GRANULARITY_DAY
+
+	# Nothing is sold in the future, and an unbounded range would build (and cache) a bucket per day.
+	end = min(end, today)
+	start = min(start, end)
+	if (end - start).days >= MAX_RANGE_DAYS:
+		start = end - timedelta(days=MAX_RANGE_DAYS - 1)
+		messages.info(request, f"Reports cover at most {MAX_RANGE_DAYS} days; showing the last {MAX_RANGE_DAYS} up to {end:%Y-%m-%d}.")
+	if granularity == GRANULARITY_WEEK:
+		# Start on a Monday so the first weekly bucket is a whole week.
+		start -= timedelta(days=start.weekday())
+
+	report = sales_report(start, end, granularity)
+
+	context = {
+		"report": report,
+		"start": start,
+		"end": end,
+		"granularity": granularity,
+		"granularities": GRANULARITIES,
+	}
+	return render(request, "sales_report.html", context)
+
+
+@login_required
+@reporting_reads()
+def admin_kitchen_metrics(request):
+	if not request.user.is_staff:
+		return redirect("customer_dashboard")
+
+	try:
+		days = min(max(int(request.GET.get("days", 14)), 1), 90)
+	except ValueError:
+		days = 14
+
+	context = {
+		"days": days,
+		"queue": queue_depth(),
+		"rows": throughput_by_hour(days),
+	}
+	return render(request, "kitchen_metrics.html", context)
+
+
+@login_required
+def admin_profiles(request):
+	if not request.user.is_staff:
+		return redirect("customer_dashboard")
+
+	profiles = recent_profiles()
+	selected_id = request.GET.get("id", "").strip()
+	selected = next((entry for entry in profiles if entry["id"] == selected_id), None)
+	functions = top_functions(selected_id) if selected else []
+
+	context = {
+		"profiles": profiles,
+		"selected": selected,
+		"functions": functions,
+	}
+	return render(request, "profiles.html", context)
+
+
+@login_required
+def admin_slow_queries(request):
+	if not request.user.is_staff:
+		return redirect("customer_dashboard")
+
+	slow_queries = SlowQuery.objects.order_by("-total_ms")[:100]
+
+	context = {
+		"slow_queries": slow_queries,
+		"enabled": settings.SLOW_QUERY_LOG_ENABLED,
+		"threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+	}
+	return render(request, "slow_queries.html", context)
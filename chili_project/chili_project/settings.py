@@ -47,11 +47,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'chili_app.static_pages.PrerenderedWhiteNoiseMiddleware',
+    'chili_app.media.MediaMiddleware',
+    'chili_app.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'chili_app.profiling.ProfilingMiddleware',
+    'chili_app.slow_queries.SlowQueryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,6 +90,49 @@ DATABASES = {
     }
 }
 
+# Optional read replica for tagged reporting reads (chili_app.routers).
+# Locally a second SQLite file refreshed with `manage.py sync_replica` can
+# stand in for it.
+if os.getenv("DJANGO_REPLICA_DB_NAME"):
+    DATABASES['replica'] = {
+        'ENGINE': os.getenv("DJANGO_REPLICA_DB_ENGINE", 'django.db.backends.sqlite3'),
+        'NAME': os.getenv("DJANGO_REPLICA_DB_NAME"),
+        'HOST': os.getenv("DJANGO_REPLICA_DB_HOST", ""),
+        'PORT': os.getenv("DJANGO_REPLICA_DB_PORT", ""),
+        'USER': os.getenv("DJANGO_REPLICA_DB_USER", ""),
+        'PASSWORD': os.getenv("DJANGO_REPLICA_DB_PASSWORD", ""),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['chili_app.routers.ReplicaRouter']
+
+# Seconds a client stays pinned to the primary after its own write, i.e. the
+# replication lag we are willing to hide.
+REPLICA_LAG_TOLERANCE = int(os.getenv("DJANGO_REPLICA_LAG_TOLERANCE", "5"))
+
+# Users are loaded from the cache on each request (chili_app.backends).
+# Sessions record the backend's dotted path, so sessions created under the
+# stock ModelBackend are rejected after switching and those users log in again.
+AUTHENTICATION_BACKENDS = ['chili_app.backends.CachedModelBackend']
+
+# Sessions, the cached request user, the sales report version and the login
+# throttle counters share the default cache. LocMemCache is per process, so
+# gunicorn.conf.py pins a single worker; configure a shared backend here
+# before running more.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Cache-first sessions (chili_app.sessions); the database copy is refreshed
+# at most every SESSION_DB_WRITE_INTERVAL seconds per session.
+SESSION_ENGINE = 'chili_app.sessions'
+SESSION_DB_WRITE_INTERVAL = 60
+# Carts untouched for this many seconds are dropped (chili_app.sessions and
+# `manage.py cleanup_sessions`).
+CART_ABANDONED_AFTER = 3 * 24 * 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,3 +183,107 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'customer_dashboard'
 LOGOUT_REDIRECT_URL = 'home'
+
+# Failed-login throttling (chili_app.throttle). Each client IP and each
+# username may fail this many times per LOGIN_THROTTLE_REFILL_SECONDS window
+# before being locked out for the rest of the window.
+LOGIN_THROTTLE_ENABLED = os.getenv("DJANGO_LOGIN_THROTTLE_ENABLED", "True").lower() == "true"
+LOGIN_THROTTLE_IP_CAPACITY = 20
+LOGIN_THROTTLE_USERNAME_CAPACITY = 5
+LOGIN_THROTTLE_REFILL_SECONDS = 300
+
+# Number of reverse proxies in front of the app that append to
+# X-Forwarded-For. With 0 the header is ignored, since clients could otherwise
+# pick a fresh "IP" for every attempt. Render (which sets RENDER in the
+# environment) has one; behind it REMOTE_ADDR is the proxy, and counting it
+# would put every visitor in one login-throttle bucket.
+TRUSTED_PROXY_COUNT = int(os.getenv("DJANGO_TRUSTED_PROXY_COUNT", "1" if os.getenv("RENDER") else "0"))
+
+# On-demand request profiling for staff (chili_app.profiling): add ?profile=1
+# or an "X-Profile: 1" header. Captures are kept under PROFILING_DIR up to
+# PROFILING_MAX_BYTES in total; the oldest are removed first.
+PROFILING_ENABLED = os.getenv("DJANGO_PROFILING_ENABLED", "True").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("DJANGO_PROFILING_SAMPLE_RATE", "1.0"))
+PROFILING_DIR = Path(os.getenv("DJANGO_PROFILING_DIR", BASE_DIR / 'profiles'))
+PROFILING_MAX_BYTES = 50 * 1024 * 1024
+
+# Slow query log (chili_app.slow_queries): ORM queries from chili_app slower
+# than the threshold are logged and aggregated for staff at
+# /admin/slow-queries/, with EXPLAIN output captured once per fingerprint.
+SLOW_QUERY_LOG_ENABLED = os.getenv("DJANGO_SLOW_QUERY_LOG_ENABLED", "False").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("DJANGO_SLOW_QUERY_THRESHOLD_MS", "100"))
+
+# Seconds a cart line holds its stock before the hold expires
+# (chili_app.reservations); run `manage.py expire_reservations` periodically.
+STOCK_RESERVATION_TTL = 15 * 60
+
+# Pre-rendered order receipts (chili_app.receipts). Kept outside MEDIA_ROOT
+# because receipts are private to the customer and staff.
+RECEIPTS_DIR = Path(os.getenv("DJANGO_RECEIPTS_DIR", BASE_DIR / 'receipts'))
+
+# Templates: outside DEBUG, always use the cached loader (APP_DIRS cannot be
+# combined with an explicit loader list). Compiled templates are warmed at
+# startup by chili_app.templating.warm_templates() in wsgi.py.
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+# Optional Jinja2 backend for the hot list pages (ports live in jinja2_templates/).
+# Requires the jinja2 package; every template without a port still renders
+# with the Django engine. `manage.py bench_templates` compares both engines.
+JINJA2_TEMPLATE_ENGINE = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'NAME': 'jinja2',
+    'DIRS': [BASE_DIR / 'jinja2_templates'],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        'environment': 'chili_app.jinja_env.environment',
+        'autoescape': True,
+        'auto_reload': DEBUG,
+    },
+}
+if os.getenv("DJANGO_JINJA2_TEMPLATES", "False").lower() == "true":
+    try:
+        import jinja2  # noqa: F401
+    except ImportError as exc:
+        from django.core.exceptions import ImproperlyConfigured
+        raise ImproperlyConfigured("DJANGO_JINJA2_TEMPLATES requires the jinja2 package.") from exc
+    TEMPLATES.insert(0, JINJA2_TEMPLATE_ENGINE)
+
+# Pre-rendered anonymous pages (chili_app.static_pages), built by
+# `manage.py build_static_pages` and served by WhiteNoise from the site root.
+# Login and register stay dynamic because their forms carry a CSRF token.
+PRERENDERED_PAGES = ['home']
+PRERENDERED_DIR = Path(os.getenv("DJANGO_PRERENDERED_DIR", BASE_DIR / 'prerendered'))
+PRERENDERED_MAX_AGE = 300
+WHITENOISE_ROOT = PRERENDERED_DIR
+WHITENOISE_INDEX_FILE = True
+
+# Uploaded media (chili_app.media): uploads get content-hashed names and are
+# served by MediaMiddleware in every environment. Hashed files are cached
+# forever; older unhashed files for MEDIA_MAX_AGE seconds until
+# `manage.py hash_media` renames them.
+STORAGES = {
+    'default': {'BACKEND': 'chili_app.media.HashedMediaStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_MAX_AGE = 60 * 60
+
+# Pickup slots (chili_app.pickup): PICKUP_SLOT_MINUTES-long slots between
+# PICKUP_HOURS (hours on the shop's clock in PICKUP_TIME_ZONE, independent of
+# TIME_ZONE), bookable from PICKUP_LEAD_MINUTES ahead. PICKUP_SLOT_CAPACITY
+# caps the units per slot for categories the kitchen prepares; categories not
+# listed are unlimited.
+PICKUP_TIME_ZONE = os.getenv("DJANGO_PICKUP_TIME_ZONE", 'Asia/Manila')
+PICKUP_SLOT_MINUTES = 30
+PICKUP_HOURS = (10, 20)
+PICKUP_LEAD_MINUTES = 20
+PICKUP_SLOT_CAPACITY = {
+    'meal': 12,
+    'snack': 20,
+}
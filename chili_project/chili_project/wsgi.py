@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chili_project.settings')
 
 application = get_wsgi_application()
+
+# Compile the hot templates before the first request arrives.
+from chili_app.templating import warm_templates  # noqa: E402
+
+warm_templates()
@@ -0,0 +1,23 @@
+# Gunicorn settings, read from the working directory the Procfile starts in.
+#
+# Sessions (chili_app.sessions), the cached request user (chili_app.backends),
+# the sales report version and the login throttle counters all live in
+# Django's default cache. Without a shared backend in CACHES that is a
+# per-process LocMemCache, and a second worker would not see logouts, user
+# invalidations, report bumps or failed logins recorded by the first. Run one
+# worker (WEB_CONCURRENCY is ignored) and refuse to start with more.
+import os
+
+workers = 1
+
+
+def on_starting(server):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chili_project.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if server.cfg.workers > 1 and backend.endswith('LocMemCache'):
+        raise RuntimeError(
+            f"{server.cfg.workers} workers cannot share {backend}; "
+            "configure a shared cache in CACHES or run a single worker."
+        )